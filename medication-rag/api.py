@@ -3,11 +3,19 @@ Medication RAG FastAPI Server
 Run: uvicorn api:app --reload --port 8001
 """
 
+from cachetools import TTLCache
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+import asyncio
+import hashlib
 import logging
+import os
+import orjson
 
 from rag_core import MedicationRAG
 
@@ -15,38 +23,60 @@ from rag_core import MedicationRAG
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# RAG 인스턴스
+rag: Optional[MedicationRAG] = None
+_init_task: Optional[asyncio.Task] = None
+
+
+async def _initialize_rag():
+    """RAG 초기화 + 워밍업 검색 (임베딩 모델/인덱스 로드는 별도 스레드에서 실행)"""
+    try:
+        logger.info("Initializing MedicationRAG...")
+        await asyncio.to_thread(rag.warm_up)
+        logger.info("MedicationRAG ready!")
+    except FileNotFoundError as e:
+        logger.warning(f"RAG not ready: {e}")
+        logger.warning("Run fetch_documents.py and build_index.py first.")
+    except Exception as e:
+        logger.error(f"RAG initialization failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작 시 RAG 초기화를 백그라운드로 시작 (/health는 바로 응답)"""
+    global rag, _init_task
+    rag = MedicationRAG()
+    _init_task = asyncio.create_task(_initialize_rag())
+    yield
+
+
 # FastAPI 앱
 app = FastAPI(
     title="Medication RAG API",
     description="위고비/마운자로 전문 AI 상담 API",
     version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# CORS (React dev server)
+# CORS (React dev server) - server/의 CORS_ORIGINS와 같은 기본값
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ORIGINS",
+        "http://localhost:8080,http://localhost:8081,http://localhost:5173,http://localhost:3000",
+    ).split(",")
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# RAG 인스턴스
-rag: Optional[MedicationRAG] = None
-
-
-@app.on_event("startup")
-async def startup():
-    """서버 시작 시 RAG 초기화"""
-    global rag
-    try:
-        logger.info("Initializing MedicationRAG...")
-        rag = MedicationRAG()
-        rag.initialize()
-        logger.info("MedicationRAG ready!")
-    except FileNotFoundError as e:
-        logger.warning(f"RAG not ready: {e}")
-        logger.warning("Run fetch_documents.py and build_index.py first.")
+# 한국어 응답 본문 압축 (작은 응답은 그대로)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
 
 
 class QueryRequest(BaseModel):
@@ -64,6 +94,33 @@ class QueryResponse(BaseModel):
     sources: List[str] = []  # RAG 검색 출처
 
 
+# 반복 질문 응답 캐시 (데모/스모크 테스트에서 같은 질문이 자주 반복됨, 프로세스 내)
+ASK_CACHE_TTL = int(os.getenv("ASK_CACHE_TTL", "600"))
+_ask_cache: TTLCache = TTLCache(maxsize=512, ttl=ASK_CACHE_TTL)
+
+
+def _ask_cache_key(request: QueryRequest) -> bytes:
+    """정규화한 질문 + 건강 데이터 + 옵션으로 캐시 키 생성"""
+    raw = "\0".join((
+        request.query.strip().lower(),
+        request.user_context or "",
+        "rag" if request.use_rag else "llm",
+        request.intent,
+    ))
+    return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+
+
+def _require_rag():
+    """RAG 준비 안 됐으면 503"""
+    if not rag or not rag._initialized:
+        if _init_task and not _init_task.done():
+            raise HTTPException(status_code=503, detail="RAG warming up")
+        raise HTTPException(
+            status_code=503,
+            detail="RAG not initialized. Run setup scripts first."
+        )
+
+
 @app.post("/ask", response_model=QueryResponse)
 async def ask_endpoint(request: QueryRequest):
     """
@@ -78,31 +135,68 @@ async def ask_endpoint(request: QueryRequest):
     Returns:
         AI 응답, 응급 상황 여부, 참고 출처
     """
-    if not rag or not rag._initialized:
-        raise HTTPException(
-            status_code=503,
-            detail="RAG not initialized. Run setup scripts first."
-        )
+    _require_rag()
+
+    cache_key = _ask_cache_key(request)
+    cached = _ask_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        result = rag.ask(
+        result = await rag.aask(
             query=request.query,
             user_context=request.user_context or "",
             use_rag=request.use_rag,
             intent=request.intent,
         )
 
-        return QueryResponse(
+        response = QueryResponse(
             response=result["response"],
             is_emergency=result["is_emergency"],
             sources=result["sources"],
         )
+        # 응급 상황 응답은 항상 새로 생성
+        if not response.is_emergency:
+            _ask_cache[cache_key] = response
+        return response
 
     except Exception as e:
         logger.error(f"Query failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ask/stream")
+async def ask_stream_endpoint(request: QueryRequest):
+    """
+    약물 관련 질문 처리 (Server-Sent Events 스트리밍)
+
+    이벤트:
+        data: {"delta": "..."}  응답 조각
+        data: {"done": true, "is_emergency": bool, "sources": [...]}  마지막 이벤트
+        data: {"error": "..."}  처리 중 오류
+    """
+    _require_rag()
+
+    async def event_stream():
+        try:
+            async for event in rag.astream(
+                query=request.query,
+                user_context=request.user_context or "",
+                use_rag=request.use_rag,
+                intent=request.intent,
+            ):
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Stream failed: {e}")
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/health")
 async def health():
     """헬스 체크"""
@@ -112,17 +206,33 @@ async def health():
     }
 
 
+# 루트 응답은 고정값이므로 직렬화 결과를 미리 만들어 둠
+_ROOT_BYTES = orjson.dumps({
+    "name": "Medication RAG API",
+    "version": "2.0.0",
+    "docs": "/docs",
+    "health": "/health",
+})
+
+
 @app.get("/")
 async def root():
     """루트 엔드포인트"""
-    return {
-        "name": "Medication RAG API",
-        "version": "2.0.0",
-        "docs": "/docs",
-        "health": "/health",
-    }
+    return Response(_ROOT_BYTES, media_type="application/json")
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+
+    # uvloop(libuv) + httptools(C 파서), Windows는 uvloop 미지원이라 기본 asyncio 루프
+    # 워커마다 임베딩 모델/인덱스를 따로 로드하므로 메모리를 보고 RAG_WORKERS 조절
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8001,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("RAG_WORKERS", "1")),
+        log_level="info",
+    )
@@ -3,7 +3,10 @@ LlamaIndex 벡터 인덱스 빌더
 수집된 문서를 임베딩하여 RAG용 인덱스 생성
 """
 
+import hashlib
+import json
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,12 +14,24 @@ from dotenv import load_dotenv
 PROJECT_ROOT = Path(__file__).parent.parent
 load_dotenv(PROJECT_ROOT / ".env.local")
 
+# 임베딩 모델 로컬 캐시: 한 번 받은 뒤에는 HuggingFace Hub에 접속하지 않음
+# (huggingface_hub가 import 시점에 읽으므로 llama_index import 전에 설정)
+HF_CACHE_DIR = Path(__file__).parent / ".hf_cache"
+HF_CACHE_MARKER = HF_CACHE_DIR / ".complete"  # 모델 로드 성공 후 생성 (중단된 다운로드는 이어받기)
+if HF_CACHE_MARKER.exists():
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+import torch
+
 from llama_index.core import (
     SimpleDirectoryReader,
     VectorStoreIndex,
     StorageContext,
     Settings,
 )
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import MetadataMode
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.openai import OpenAI
 
@@ -24,40 +39,68 @@ from llama_index.llms.openai import OpenAI
 BASE_DIR = Path(__file__).parent
 DOCS_DIR = BASE_DIR / "docs"
 STORAGE_DIR = BASE_DIR / "storage"
+HASHES_PATH = STORAGE_DIR / "content_hashes.json"
+
+# 이 개수 이상일 때만 멀티프로세스로 문서 로드 (적으면 프로세스 생성 비용이 더 큼)
+PARALLEL_LOAD_MIN_FILES = 50
+
+
+def file_name_metadata(path: str) -> dict:
+    """문서 메타데이터 (file_name만 사용, 멀티프로세스 로드를 위해 모듈 함수로 정의)"""
+    return {"file_name": os.path.basename(path)}
+
+
+# 인덱스 내용에 영향을 주는 설정 (바뀌면 문서가 같아도 재빌드)
+INDEX_CONFIG = {
+    "embed_model": "BAAI/bge-m3",
+    "chunk_size": 1024,
+    "chunk_overlap": 128,
+}
+
 
+def compute_content_hashes(documents) -> dict:
+    """문서별 내용 해시 (BLAKE2b) + 인덱스 설정"""
+    files = {
+        doc.metadata.get("file_name", "unknown"): hashlib.blake2b(
+            doc.text.encode("utf-8"), digest_size=16
+        ).hexdigest()
+        for doc in documents
+    }
+    return {"config": INDEX_CONFIG, "files": files}
 
-def build_index():
-    """문서 로드 및 인덱스 빌드"""
+
+def load_content_hashes():
+    """이전 빌드 시 저장한 해시 (없거나 손상되면 None)"""
+    try:
+        with open(HASHES_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_index(force: bool = False):
+    """문서 로드 및 인덱스 빌드 (문서/설정이 그대로면 건너뜀)"""
 
     print("=" * 50)
     print("Building Medication RAG Index")
     print("=" * 50)
 
-    # 1. 임베딩 모델 설정 (한국어 지원 다국어 모델)
-    print("\n[1/4] Loading embedding model...")
-    Settings.embed_model = HuggingFaceEmbedding(
-        model_name="BAAI/bge-m3",  # 다국어 지원, 한국어 성능 좋음
-    )
-
-    # 2. LLM 설정
-    print("[2/4] Configuring LLM...")
-    Settings.llm = OpenAI(
-        model="gpt-4o-mini",
-        temperature=0.1,
-    )
-
-    # 3. 문서 로드
-    print(f"[3/4] Loading documents from {DOCS_DIR}...")
+    # 1. 문서 로드
+    print(f"\n[1/4] Loading documents from {DOCS_DIR}...")
 
     if not DOCS_DIR.exists():
         raise FileNotFoundError(f"Docs directory not found: {DOCS_DIR}")
 
     # .txt 파일만 로드 (manifest.json 제외)
-    documents = SimpleDirectoryReader(
+    # 메타데이터는 file_name만 사용하므로 기본 stat() 기반 메타데이터 생성은 생략
+    reader = SimpleDirectoryReader(
         input_dir=str(DOCS_DIR),
         required_exts=[".txt"],
         recursive=False,
-    ).load_data()
+        file_metadata=file_name_metadata,
+    )
+    num_workers = os.cpu_count() if len(reader.input_files) >= PARALLEL_LOAD_MIN_FILES else None
+    documents = reader.load_data(num_workers=num_workers)
 
     print(f"  Loaded {len(documents)} documents")
 
@@ -65,17 +108,64 @@ def build_index():
         filename = doc.metadata.get("file_name", "unknown")
         print(f"    - {filename}: {len(doc.text)} chars")
 
+    # 변경 사항이 없으면 임베딩 모델을 로드하지 않고 종료
+    content_hashes = compute_content_hashes(documents)
+    index_exists = (STORAGE_DIR / "docstore.json").exists()
+    if not force and index_exists and load_content_hashes() == content_hashes:
+        print("\nIndex up-to-date (no document changes). Use --force to rebuild.")
+        return
+
+    # 2. 임베딩 모델 설정 (한국어 지원 다국어 모델)
+    print("[2/4] Loading embedding model...")
+    # GPU에서는 fp16으로 메모리 대역폭 절반 (CPU는 fp16 연산이 느려 fp32 유지)
+    model_kwargs = {"torch_dtype": torch.float16} if torch.cuda.is_available() else {}
+    Settings.embed_model = HuggingFaceEmbedding(
+        model_name=INDEX_CONFIG["embed_model"],  # 다국어 지원, 한국어 성능 좋음
+        cache_folder=str(HF_CACHE_DIR),
+        embed_batch_size=64,
+        model_kwargs=model_kwargs,
+    )
+    HF_CACHE_MARKER.touch()
+
+    # 청킹 설정 고정 (임베딩 호출 수 예측 가능)
+    Settings.chunk_size = INDEX_CONFIG["chunk_size"]
+    Settings.chunk_overlap = INDEX_CONFIG["chunk_overlap"]
+
+    # 3. LLM 설정
+    print("[3/4] Configuring LLM...")
+    Settings.llm = OpenAI(
+        model="gpt-4o-mini",
+        temperature=0.1,
+    )
+
     # 4. 인덱스 빌드
     print("[4/4] Building vector index...")
 
-    index = VectorStoreIndex.from_documents(
-        documents,
-        show_progress=True,
+    # 청킹 후 전체 청크를 SentenceTransformer.encode 한 번으로 임베딩
+    # (LlamaIndex 래퍼의 배치별 호출을 거치지 않음, 임베딩 텍스트는 LlamaIndex와 동일하게 EMBED 모드)
+    nodes = SentenceSplitter(
+        chunk_size=INDEX_CONFIG["chunk_size"],
+        chunk_overlap=INDEX_CONFIG["chunk_overlap"],
+    ).get_nodes_from_documents(documents, show_progress=True)
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    embeddings = Settings.embed_model._model.encode(
+        texts,
+        batch_size=64,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=True,
     )
+    for node, embedding in zip(nodes, embeddings):
+        node.embedding = embedding.tolist()
+
+    print(f"  Embedded {len(nodes)} chunks")
+    index = VectorStoreIndex(nodes)
 
-    # 5. 저장
+    # 5. 저장 (해시는 인덱스 저장이 끝난 뒤 기록)
     STORAGE_DIR.mkdir(parents=True, exist_ok=True)
     index.storage_context.persist(persist_dir=str(STORAGE_DIR))
+    with open(HASHES_PATH, "w", encoding="utf-8") as f:
+        json.dump(content_hashes, f, ensure_ascii=False, indent=2)
 
     print(f"\n{'='*50}")
     print(f"Index saved to: {STORAGE_DIR}")
@@ -83,4 +173,4 @@ def build_index():
 
 
 if __name__ == "__main__":
-    build_index()
+    build_index(force="--force" in sys.argv)
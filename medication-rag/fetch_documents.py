@@ -3,8 +3,11 @@ MFDS 의약품 문서 수집기
 nedrug.mfds.go.kr에서 위고비/마운자로 정보를 XML로 다운로드
 """
 
+import asyncio
 import httpx
 import os
+import re
+from html import unescape
 from pathlib import Path
 from bs4 import BeautifulSoup
 import json
@@ -32,49 +35,45 @@ SECTION_NAMES = {
     "NB": "주의사항"
 }
 
+# XML 본문에 남아있는 HTML 태그 (<sup>숫자</sup>는 따로 캡처)
+_TAG_RE = re.compile(r"<sup>(\d+)</sup>|<[^>]+>")
+_NBSP_TABLE = str.maketrans({"\xa0": " "})
 
-def fetch_xml(cache_seq: str, section: str) -> str:
+
+def _replace_tag(match: re.Match) -> str:
+    """<sup>2</sup> -> ², <sup>N</sup> -> ^(N), 나머지 태그는 줄바꿈"""
+    sup = match.group(1)
+    if sup is None:
+        return "\n"
+    return "²" if sup == "2" else f"^({sup})"
+
+
+async def fetch_xml(client: httpx.AsyncClient, cache_seq: str, section: str) -> str:
     """XML 문서 다운로드"""
     url = f"{BASE_URL}/pbp/cmn/xml/drb/{cache_seq}/{section}"
     print(f"  Fetching: {url}")
 
-    response = httpx.get(url, timeout=30.0, follow_redirects=True)
+    response = await client.get(url)
     response.raise_for_status()
     return response.text
 
 
-def fetch_html(cache_seq: str, section: str) -> str:
+async def fetch_html(client: httpx.AsyncClient, cache_seq: str, section: str) -> str:
     """HTML 문서 다운로드 (백업용)"""
     url = f"{BASE_URL}/pbp/cmn/html/drb/{cache_seq}/{section}"
     print(f"  Fetching HTML: {url}")
 
-    response = httpx.get(url, timeout=30.0, follow_redirects=True)
+    response = await client.get(url)
     response.raise_for_status()
     return response.text
 
 
 def parse_xml_to_text(xml_content: str) -> str:
     """XML에서 텍스트 추출 (HTML 태그도 제거)"""
-    import re
-
-    # 1차: XML 파싱
+    # XML 파싱은 한 번만, 남은 HTML 태그는 정규식 한 번으로 처리
     soup = BeautifulSoup(xml_content, "lxml-xml")
     text = soup.get_text(separator="\n", strip=True)
-
-    # 2차: 남아있는 HTML 태그 제거
-    soup2 = BeautifulSoup(text, "html.parser")
-    text = soup2.get_text(separator="\n", strip=True)
-
-    # HTML 엔티티 정리
-    text = text.replace("&nbsp;", " ")
-    text = text.replace("&lt;", "<")
-    text = text.replace("&gt;", ">")
-    text = text.replace("&amp;", "&")
-
-    # sup/sub 태그 내용 정리 (예: <sup>2</sup> -> ²)
-    text = re.sub(r'<sup>2</sup>', '²', text)
-    text = re.sub(r'<sup>(\d+)</sup>', r'^(\1)', text)
-    text = re.sub(r'<[^>]+>', '', text)  # 나머지 태그 제거
+    text = unescape(_TAG_RE.sub(_replace_tag, text)).translate(_NBSP_TABLE)
 
     # 빈 줄 정리
     lines = [line.strip() for line in text.split("\n") if line.strip()]
@@ -83,7 +82,8 @@ def parse_xml_to_text(xml_content: str) -> str:
 
 def parse_html_to_text(html_content: str) -> str:
     """HTML에서 텍스트 추출"""
-    soup = BeautifulSoup(html_content, "html.parser")
+    # XML 파싱과 같은 lxml(C) 백엔드 사용 (html.parser는 순수 파이썬이라 느림)
+    soup = BeautifulSoup(html_content, "lxml")
 
     # 스크립트, 스타일 제거
     for tag in soup(["script", "style"]):
@@ -113,38 +113,47 @@ def save_document(med_id: str, med_name: str, section: str, content: str):
     return filepath
 
 
-def main():
-    """메인 수집 함수"""
-    DOCS_DIR.mkdir(parents=True, exist_ok=True)
+async def collect_section(client: httpx.AsyncClient, med_id: str, med_info: dict, section: str):
+    """섹션 하나 수집 (XML 우선, 내용이 없으면 HTML). 저장된 파일 경로 또는 None 반환"""
+    label = f"[{med_info['name']} - {SECTION_NAMES.get(section, section)}]"
+
+    try:
+        # XML 먼저 시도
+        xml_content = await fetch_xml(client, med_info["cache_seq"], section)
+        text_content = parse_xml_to_text(xml_content)
+
+        if len(text_content) < 100:
+            # XML이 비어있으면 HTML 시도
+            print(f"  {label} XML empty, trying HTML...")
+            html_content = await fetch_html(client, med_info["cache_seq"], section)
+            text_content = parse_html_to_text(html_content)
 
-    collected_files = []
+        filepath = save_document(med_id, med_info["name"], section, text_content)
+        print(f"  {label} Content length: {len(text_content)} chars")
+        return str(filepath)
 
-    for med_id, med_info in MEDICATIONS.items():
-        print(f"\n{'='*50}")
-        print(f"Collecting: {med_info['name']}")
-        print(f"{'='*50}")
+    except Exception as e:
+        print(f"  {label} Error: {e}")
+        return None
 
-        for section in med_info["sections"]:
-            section_name = SECTION_NAMES.get(section, section)
-            print(f"\n[{section_name}]")
 
-            try:
-                # XML 먼저 시도
-                xml_content = fetch_xml(med_info["cache_seq"], section)
-                text_content = parse_xml_to_text(xml_content)
+async def main():
+    """메인 수집 함수 (모든 약품/섹션을 동시에 다운로드)"""
+    DOCS_DIR.mkdir(parents=True, exist_ok=True)
 
-                if len(text_content) < 100:
-                    # XML이 비어있으면 HTML 시도
-                    print("  XML empty, trying HTML...")
-                    html_content = fetch_html(med_info["cache_seq"], section)
-                    text_content = parse_html_to_text(html_content)
+    print(f"\n{'='*50}")
+    print(f"Collecting: {', '.join(med['name'] for med in MEDICATIONS.values())}")
+    print(f"{'='*50}")
 
-                filepath = save_document(med_id, med_info["name"], section, text_content)
-                collected_files.append(str(filepath))
-                print(f"  Content length: {len(text_content)} chars")
+    # 하나의 클라이언트로 커넥션 풀 공유
+    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        results = await asyncio.gather(*(
+            collect_section(client, med_id, med_info, section)
+            for med_id, med_info in MEDICATIONS.items()
+            for section in med_info["sections"]
+        ))
 
-            except Exception as e:
-                print(f"  Error: {e}")
+    collected_files = [path for path in results if path]
 
     # 수집 결과 저장
     manifest = {
@@ -162,4 +171,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+임베딩 모델 int8 양자화
+BAAI/bge-m3를 ONNX로 변환한 뒤 동적 int8 양자화 (CPU 서빙용, 1회 실행)
+- 결과: models/bge-m3-int8/ (폴더가 있으면 rag_core가 자동으로 사용)
+"""
+
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+MODEL_NAME = "BAAI/bge-m3"
+ONNX_DIR = BASE_DIR / "models" / "bge-m3-onnx"
+INT8_DIR = BASE_DIR / "models" / "bge-m3-int8"
+
+
+def quantize(use_avx512: bool = True):
+    """ONNX 변환 → int8 양자화 (가중치만 int8, 활성값은 실행 시 동적 양자화)"""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    print(f"[1/2] ONNX 변환: {MODEL_NAME}")
+    model = ORTModelForFeatureExtraction.from_pretrained(MODEL_NAME, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model.save_pretrained(ONNX_DIR)
+    tokenizer.save_pretrained(ONNX_DIR)
+
+    # AVX-512 VNNI 지원 CPU면 int8 내적 명령 사용, 아니면 AVX2 설정
+    print("[2/2] int8 양자화")
+    if use_avx512:
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    else:
+        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer = ORTQuantizer.from_pretrained(ONNX_DIR)
+    # bge-m3 FP32 ONNX는 2GB를 넘어서 external data 형식 필요
+    quantizer.quantize(
+        save_dir=INT8_DIR,
+        quantization_config=qconfig,
+        use_external_data_format=True,
+    )
+    tokenizer.save_pretrained(INT8_DIR)
+
+    print(f"\n양자화 완료: {INT8_DIR}")
+
+
+if __name__ == "__main__":
+    quantize(use_avx512="--avx2" not in sys.argv)
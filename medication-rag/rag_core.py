@@ -4,9 +4,18 @@ Medication RAG Core Module
 - 응급 상황 감지 및 의료 안전 가드레일 포함
 """
 
+import asyncio
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, List, Optional
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick 미설치 환경은 튜플 순회로 대체
+    ahocorasick = None
+import numpy as np
+import torch
 from dotenv import load_dotenv
 
 # .env.local 로드
@@ -15,15 +24,26 @@ PROJECT_ROOT = BASE_DIR.parent
 load_dotenv(PROJECT_ROOT / ".env.local")
 
 from llama_index.core import StorageContext, load_index_from_storage, Settings
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.openai import OpenAI
 
 # Paths
 STORAGE_DIR = BASE_DIR / "storage"
+# int8 양자화 ONNX 임베딩 모델 (python quantize_embedding.py로 생성, 없으면 FP32 모델 사용)
+ONNX_EMBED_DIR = BASE_DIR / "models" / "bge-m3-int8"
 
 # Retrieval settings
 SIMILARITY_TOP_K = 4
 
+# (선택) 재정렬: 후보를 넓게 검색한 뒤 cross-encoder로 상위 몇 개만 LLM에 전달 (RAG_RERANK=1)
+# CPU에서는 후보 20개 재정렬이 LLM 절약분보다 느릴 수 있어 기본은 끔
+RERANK_MODEL = "BAAI/bge-reranker-v2-m3"
+RERANK_CANDIDATES = 20
+RERANK_TOP_N = 3
+
 # 응급 상황 키워드 (한국어 + 영어)
 EMERGENCY_KEYWORDS = [
     # 심각한 부작용
@@ -36,6 +56,24 @@ EMERGENCY_KEYWORDS = [
     "severe pain", "anaphylaxis", "pancreatitis",
 ]
 
+
+# 소문자 변환은 모듈 로드 시 1회
+_EMERGENCY_KEYWORDS_LOWER = tuple(kw.lower() for kw in EMERGENCY_KEYWORDS)
+
+
+def _build_emergency_automaton() -> Optional["ahocorasick.Automaton"]:
+    """응급 키워드 전체를 Aho-Corasick 오토마톤 하나로 컴파일 (모듈 로드 시 1회)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw_lower, kw in zip(_EMERGENCY_KEYWORDS_LOWER, EMERGENCY_KEYWORDS):
+        automaton.add_word(kw_lower, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+_EMERGENCY_AUTOMATON = _build_emergency_automaton()
+
 # 시스템 프롬프트 - 전문 의료 상담사 (Dashboard 챗봇과 완전 분리)
 SYSTEM_PROMPT = """당신은 식품의약품안전처 공식 허가 정보를 기반으로 하는
 위고비/마운자로 전문 AI 의약품 상담사입니다.
@@ -82,6 +120,96 @@ EMERGENCY_RESPONSE = """[응급 상황 안내]
 """
 
 
+def _load_embed_model():
+    """쿼리 임베딩 모델 로드 (GPU면 fp16, CPU는 int8 ONNX가 있으면 onnxruntime, 없으면 FP32)"""
+    if torch.cuda.is_available():
+        print("[RAG] Using CUDA fp16 embedding model")
+        return HuggingFaceEmbedding(
+            model_name="BAAI/bge-m3",
+            device="cuda",
+            model_kwargs={"torch_dtype": torch.float16},
+        )
+    if ONNX_EMBED_DIR.exists():
+        from llama_index.embeddings.huggingface_optimum import OptimumEmbedding
+
+        print("[RAG] Using int8 ONNX embedding model")
+        # bge-m3: CLS 풀링 + L2 정규화 (FP32 인덱스와 같은 벡터 공간)
+        return OptimumEmbedding(folder_name=str(ONNX_EMBED_DIR), pooling="cls", normalize=True)
+    return HuggingFaceEmbedding(model_name="BAAI/bge-m3", device="cpu")
+
+
+def _load_reranker() -> list:
+    """검색 결과 재정렬기 (RAG_RERANK=1일 때만, 아니면 빈 목록)"""
+    if os.getenv("RAG_RERANK", "0") != "1":
+        return []
+    from llama_index.core.postprocessor import SentenceTransformerRerank
+
+    print(f"[RAG] Using reranker: {RERANK_MODEL} (top {RERANK_TOP_N} of {RERANK_CANDIDATES})")
+    return [SentenceTransformerRerank(model=RERANK_MODEL, top_n=RERANK_TOP_N)]
+
+
+@lru_cache(maxsize=None)
+def _get_openai_client():
+    """LLM 전용 답변용 OpenAI 클라이언트 (프로세스당 1개, 연결 풀 재사용)"""
+    from openai import OpenAI as OpenAIClient
+
+    return OpenAIClient(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@lru_cache(maxsize=None)
+def _get_async_openai_client():
+    """_get_openai_client의 비동기 버전"""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+class MatrixRetriever(BaseRetriever):
+    """인덱스 임베딩 전체를 정규화 행렬 하나로 올려두고 행렬-벡터 곱 한 번으로 top-k 검색
+
+    SimpleVectorStore 기본 검색은 노드마다 파이썬 루프로 유사도를 계산함
+    """
+
+    def __init__(self, index, similarity_top_k: int = SIMILARITY_TOP_K):
+        super().__init__()
+        embedding_dict = index.vector_store.data.embedding_dict
+        self._docstore = index.docstore
+        self._node_ids = list(embedding_dict)
+        matrix = np.asarray(list(embedding_dict.values()), dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)  # 코사인 유사도 = 내적
+        self._matrix = matrix
+        self._top_k = min(similarity_top_k, len(self._node_ids))
+
+    @classmethod
+    def from_index(cls, index, similarity_top_k: int = SIMILARITY_TOP_K) -> Optional["MatrixRetriever"]:
+        """로컬 SimpleVectorStore 인덱스일 때만 생성 (아니면 None)"""
+        data = getattr(index.vector_store, "data", None)
+        if not getattr(data, "embedding_dict", None):
+            return None
+        return cls(index, similarity_top_k)
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        embedding = query_bundle.embedding or Settings.embed_model.get_query_embedding(
+            query_bundle.query_str
+        )
+        query_vec = np.asarray(embedding, dtype=np.float32)
+        scores = self._matrix @ (query_vec / np.linalg.norm(query_vec))
+
+        # 전체 정렬 없이 상위 k개만 고른 뒤 그 안에서 정렬
+        top = np.argpartition(scores, -self._top_k)[-self._top_k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        nodes = self._docstore.get_nodes([self._node_ids[i] for i in top])
+        return [NodeWithScore(node=node, score=float(scores[i])) for node, i in zip(nodes, top)]
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        # 질문 임베딩(모델 forward)은 블로킹이므로 스레드에서 실행
+        return await asyncio.to_thread(self._retrieve, query_bundle)
+
+
+# 모델 로드 잠금 (Settings.embed_model/llm이 전역이라 인스턴스가 아닌 모듈 단위)
+_INIT_LOCK = threading.Lock()
+
+
 class MedicationRAG:
     """위고비/마운자로 전문 RAG 시스템"""
 
@@ -89,13 +217,25 @@ class MedicationRAG:
         self.storage_dir = storage_dir or STORAGE_DIR
         self.index = None
         self.query_engine = None
+        self.stream_engine = None
         self._initialized = False
 
     def initialize(self):
-        """인덱스 로드 (lazy initialization)"""
+        """인덱스 로드 (lazy initialization, 동시에 호출돼도 모델/인덱스는 한 번만 로드)"""
         if self._initialized:
             return
 
+        with _INIT_LOCK:
+            if not self._initialized:
+                self._load()
+
+    def warm_up(self):
+        """모델/인덱스를 미리 로드하고 검색을 한 번 실행 (첫 요청의 cold start 제거, LLM 호출 없음)"""
+        self.initialize()
+        self.query_engine.retrieve(QueryBundle("위고비 용법용량"))
+
+    def _load(self):
+        """임베딩 모델/LLM 설정 + 인덱스 로드 (_INIT_LOCK 안에서만 호출)"""
         if not self.storage_dir.exists():
             raise FileNotFoundError(
                 f"Storage not found: {self.storage_dir}\n"
@@ -103,9 +243,7 @@ class MedicationRAG:
             )
 
         print("[RAG] Loading embedding model...")
-        Settings.embed_model = HuggingFaceEmbedding(
-            model_name="BAAI/bge-m3",
-        )
+        Settings.embed_model = _load_embed_model()
 
         print("[RAG] Configuring LLM...")
         Settings.llm = OpenAI(model="gpt-4o-mini", temperature=0.2)
@@ -116,40 +254,81 @@ class MedicationRAG:
         )
         self.index = load_index_from_storage(storage_context)
 
-        self.query_engine = self.index.as_query_engine(
-            similarity_top_k=SIMILARITY_TOP_K,
+        node_postprocessors = _load_reranker()
+        top_k = RERANK_CANDIDATES if node_postprocessors else SIMILARITY_TOP_K
+
+        # 일반/스트리밍 엔진이 같은 검색기/재정렬기를 공유 (모델과 임베딩 행렬은 한 번만 로드)
+        retriever = MatrixRetriever.from_index(self.index, top_k) or self.index.as_retriever(
+            similarity_top_k=top_k,
+        )
+        self.query_engine = RetrieverQueryEngine.from_args(
+            retriever,
+            node_postprocessors=node_postprocessors,
             system_prompt=SYSTEM_PROMPT,
         )
+        self.stream_engine = RetrieverQueryEngine.from_args(
+            retriever,
+            node_postprocessors=node_postprocessors,
+            system_prompt=SYSTEM_PROMPT,
+            streaming=True,
+        )
 
         self._initialized = True
         print("[RAG] Ready!")
 
     def _detect_emergency(self, query: str) -> bool:
-        """응급 키워드 감지"""
+        """응급 키워드 감지 (질문을 한 번만 스캔)"""
         query_lower = query.lower()
-        return any(kw in query_lower for kw in EMERGENCY_KEYWORDS)
-
-    def _format_sources(self, response) -> str:
-        """출처 포맷팅"""
-        if not response.source_nodes:
-            return ""
+        if _EMERGENCY_AUTOMATON is not None:
+            return next(_EMERGENCY_AUTOMATON.iter(query_lower), None) is not None
+        for kw in _EMERGENCY_KEYWORDS_LOWER:
+            if kw in query_lower:
+                return True
+        return False
+
+    @staticmethod
+    def _source_label(file_name: str) -> str:
+        """파일명에서 약물명 추출"""
+        if file_name.startswith("wegovy"):
+            return "위고비 허가사항"
+        if file_name.startswith("mounjaro"):
+            return "마운자로 허가사항"
+        return file_name
+
+    def _format_sources(self, response) -> List[str]:
+        """출처 목록 (등장 순서 유지, 중복 제거)"""
+        return list(dict.fromkeys(
+            self._source_label(node.metadata.get("file_name", "알 수 없음"))
+            for node in response.source_nodes
+        ))
+
+    def _make_result(self, is_emergency: bool, answer: str, response=None) -> dict:
+        """응답 dict 구성 (응급 안내 + 답변 + 출처, response는 RAG 응답 객체)"""
+        # 출처 수집
+        sources_list = self._format_sources(response) if response is not None else []
+
+        # 응급 안내 / 답변 / 출처 세 부분 고정이라 목록 없이 바로 연결
+        prefix = EMERGENCY_RESPONSE if is_emergency else ""
+        tail = f"\n\n[참고 출처: {', '.join(sources_list)}]" if sources_list else ""
 
-        sources = []
-        seen = set()
+        return {
+            "response": f"{prefix}{answer}{tail}",
+            "is_emergency": is_emergency,
+            "sources": sources_list,
+        }
 
-        for node in response.source_nodes:
-            source = node.metadata.get("file_name", "알 수 없음")
-            # 파일명에서 약물명 추출
-            if source.startswith("wegovy"):
-                source = "위고비 허가사항"
-            elif source.startswith("mounjaro"):
-                source = "마운자로 허가사항"
+    def _build_query(self, query: str, user_context: str, intent: str) -> str:
+        """전체 쿼리 구성 (건강 정보가 있으면 의도 포함)"""
+        if not user_context:
+            return query
+        return f"""## 사용자 건강 정보
+{user_context}
 
-            if source not in seen:
-                seen.add(source)
-                sources.append(source)
+## 의도
+{intent}
 
-        return ", ".join(sources)
+## 질문
+{query}"""
 
     def ask(
         self,
@@ -172,43 +351,100 @@ class MedicationRAG:
         """
         self.initialize()
 
-        result_parts = []
+        is_emergency = self._detect_emergency(query)
+
+        # 전체 쿼리 구성 (의도 포함)
+        full_query = self._build_query(query, user_context, intent)
+
+        if use_rag:
+            # RAG 사용
+            response = self.query_engine.query(full_query)
+            return self._make_result(is_emergency, str(response), response)
+
+        # LLM만 사용 (토큰 절약)
+        completion = _get_openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": full_query},
+            ],
+            max_tokens=500,
+            temperature=0.3,
+        )
+        return self._make_result(is_emergency, completion.choices[0].message.content)
+
+    async def aask(
+        self,
+        query: str,
+        user_context: str = "",
+        use_rag: bool = True,
+        intent: str = "medication_info",
+    ) -> dict:
+        """
+        질문에 답변 (비동기, 검색/LLM 호출 동안 이벤트 루프를 막지 않음)
+
+        Returns:
+            dict: {response, is_emergency, sources} (ask와 같은 형식)
+        """
+        await asyncio.to_thread(self.initialize)
+
+        is_emergency = self._detect_emergency(query)
+        full_query = self._build_query(query, user_context, intent)
+
+        if use_rag:
+            response = await self.query_engine.aquery(full_query)
+            return self._make_result(is_emergency, str(response), response)
+
+        # LLM만 사용 (토큰 절약)
+        completion = await _get_async_openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": full_query},
+            ],
+            max_tokens=500,
+            temperature=0.3,
+        )
+        return self._make_result(is_emergency, completion.choices[0].message.content)
+
+    async def astream(
+        self,
+        query: str,
+        user_context: str = "",
+        use_rag: bool = True,
+        intent: str = "medication_info",
+    ) -> AsyncIterator[dict]:
+        """
+        질문에 답변 (토큰 단위 스트리밍)
+
+        Yields:
+            dict: {delta} 응답 조각들, 마지막에 {done, is_emergency, sources}
+        """
+        await asyncio.to_thread(self.initialize)
+
         sources_list = []
         is_emergency = self._detect_emergency(query)
 
         # 응급 상황 체크
         if is_emergency:
-            result_parts.append(EMERGENCY_RESPONSE)
+            yield {"delta": EMERGENCY_RESPONSE}
 
-        # 전체 쿼리 구성 (의도 포함)
-        full_query = query
-        if user_context:
-            full_query = f"""## 사용자 건강 정보
-{user_context}
-
-## 의도
-{intent}
-
-## 질문
-{query}"""
+        full_query = self._build_query(query, user_context, intent)
 
         if use_rag:
-            # RAG 사용
-            response = self.query_engine.query(full_query)
-            result_parts.append(str(response))
+            # 검색 + 첫 토큰까지는 블로킹 호출이므로 스레드에서 실행
+            response = await asyncio.to_thread(self.stream_engine.query, full_query)
+            tokens = iter(response.response_gen)
+            while (token := await asyncio.to_thread(next, tokens, None)) is not None:
+                yield {"delta": token}
 
             # 출처 수집
-            sources = self._format_sources(response)
-            if sources:
-                sources_list = [s.strip() for s in sources.split(",")]
-                result_parts.append(f"\n\n[참고 출처: {sources}]")
+            sources_list = self._format_sources(response)
+            if sources_list:
+                yield {"delta": f"\n\n[참고 출처: {', '.join(sources_list)}]"}
         else:
-            # LLM만 사용 (토큰 절약)
-            from openai import OpenAI as OpenAIClient
-
-            client = OpenAIClient(api_key=os.getenv("OPENAI_API_KEY"))
-
-            completion = client.chat.completions.create(
+            # LLM만 사용 (OpenAI 스트리밍)
+            stream = await _get_async_openai_client().chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
@@ -216,15 +452,14 @@ class MedicationRAG:
                 ],
                 max_tokens=500,
                 temperature=0.3,
+                stream=True,
             )
 
-            result_parts.append(completion.choices[0].message.content)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield {"delta": chunk.choices[0].delta.content}
 
-        return {
-            "response": "".join(result_parts),
-            "is_emergency": is_emergency,
-            "sources": sources_list,
-        }
+        yield {"done": True, "is_emergency": is_emergency, "sources": sources_list}
 
     def is_emergency(self, query: str) -> bool:
         """응급 상황 여부 반환"""
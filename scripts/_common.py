@@ -0,0 +1,101 @@
+"""
+foods 스크립트 공통 모듈
+- .env.local 로드, CSV 컬럼 매핑/읽기, Supabase 동시 배치 업로드 + 재시도
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+import pandas as pd
+from dotenv import dotenv_values
+
+CSV_PATH = r'c:\Users\djgus\Downloads\food_data.csv'
+
+# 배치당 행 수 / 동시 업로드 배치 수 (1.5만 행이 한 번에 전송되는 크기,
+# 배치가 너무 크면 Supabase API 역할의 statement_timeout에 걸림)
+BATCH_SIZE = 2000
+UPLOAD_WORKERS = 8
+
+# 일시적 오류(네트워크/429/5xx) 배치 재시도: 최대 횟수 / 지수 백오프 시작·최대 대기(초)
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+
+# CSV 컬럼명 -> DB 컬럼명 매핑
+COLUMN_MAPPING = {
+    '식품코드': 'food_code',
+    '식품명': 'food_name',
+    '대표식품명': 'representative_name',
+    '식품대분류명': 'category',
+    '에너지(kcal)': 'calories',
+    '단백질(g)': 'protein',
+    '지방(g)': 'fat',
+    '탄수화물(g)': 'carbs',
+    '당류(g)': 'sugar',
+    '식이섬유(g)': 'fiber',
+    '나트륨(mg)': 'sodium',
+    '영양성분함량기준량': 'serving_size',
+    '식품중량': 'food_weight',
+}
+
+# 숫자 컬럼 (DB 컬럼명)
+NUMERIC_COLUMNS = ['calories', 'protein', 'fat', 'carbs', 'sugar', 'fiber', 'sodium']
+
+# .env.local 파일에서 Supabase 설정 읽기 (따옴표/주석/export 처리, 파일이 없으면 빈 dict)
+def load_env():
+    env_path = os.path.join(os.path.dirname(__file__), '..', '.env.local')
+    return dotenv_values(env_path, encoding='utf-8')
+
+def read_foods_csv(csv_path: str, columns, **kwargs):
+    """CP949 CSV에서 필요한 컬럼만 메모리 맵으로 읽음 (모두 문자열, 빈 칸은 '')"""
+    columns = set(columns)
+    return pd.read_csv(
+        csv_path, encoding='cp949', dtype=str, keep_default_na=False, memory_map=True,
+        usecols=lambda column: column in columns, **kwargs,
+    )
+
+def last_per_food_code(records: list[dict]) -> list[dict]:
+    """같은 food_code는 마지막 행만 남김 (순차 upsert 결과와 동일, 배치를 동시에 보내도 결과가 순서에 무관)"""
+    return list({record['food_code']: record for record in records}.values())
+
+def is_payload_error(e: Exception) -> bool:
+    """데이터 자체 오류인지 여부 (재시도해도 같은 결과)"""
+    code = str(getattr(e, 'code', None) or '')
+    # PostgreSQL 22xxx(데이터 예외) / 23xxx(제약 조건 위반) / 42xxx(구문·컬럼 오류), PostgREST PGRST1xx(요청 오류)
+    return code[:2] in ('22', '23', '42') or code.startswith('PGRST1')
+
+def retry_transient(request: Callable):
+    """request() 실행, 일시적 오류는 지수 백오프 + 지터로 재시도 (멱등 요청에만 사용)"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return request()
+        except Exception as e:
+            if is_payload_error(e) or attempt == MAX_RETRIES:
+                raise
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            print(f"  재시도 {attempt + 1}/{MAX_RETRIES} ({delay:.1f}초 후): {e}")
+            time.sleep(delay)
+
+def upload_batches(records: list[dict], upload: Callable[[int, list[dict]], int]) -> int:
+    """records를 BATCH_SIZE개씩 나눠 upload(배치 번호, 배치)를 동시에 실행 (배치마다 HTTP 왕복이 있으므로)
+
+    upload는 업로드된 레코드 수를 반환, 예외가 나면 해당 배치는 에러 출력 후 건너뜀
+
+    Returns:
+        업로드된 레코드 수
+    """
+    total_inserted = 0
+    batches = [records[i:i + BATCH_SIZE] for i in range(0, len(records), BATCH_SIZE)]
+
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        futures = {executor.submit(upload, n, batch): n for n, batch in enumerate(batches, 1)}
+        for future in as_completed(futures):
+            try:
+                total_inserted += future.result()
+                print(f"진행: {total_inserted}/{len(records)} ({total_inserted * 100 // len(records)}%)")
+            except Exception as e:
+                print(f"에러 발생 (batch {futures[future]}): {e}")
+
+    return total_inserted
@@ -3,127 +3,144 @@
 같은 food_name은 최빈 중량 기준으로 통합
 """
 
-import csv
-import os
 import re
-import sys
-from collections import defaultdict, Counter
+import pandas as pd
 from supabase import create_client, Client
 
-def load_env():
-    env_path = os.path.join(os.path.dirname(__file__), '..', '.env.local')
-    env_vars = {}
-    if os.path.exists(env_path):
-        with open(env_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key] = value
-    return env_vars
+from _common import CSV_PATH, load_env, read_foods_csv, upload_batches
 
 env_vars = load_env()
 SUPABASE_URL = env_vars.get('VITE_SUPABASE_URL', '')
 SUPABASE_KEY = env_vars.get('VITE_SUPABASE_ANON_KEY', '')
 
-CSV_PATH = r'c:\Users\djgus\Downloads\food_data.csv'
-
-def extract_number(value: str) -> float | None:
-    if not value:
-        return None
-    match = re.search(r'[\d.]+', value.strip())
-    if match:
-        try:
-            return float(match.group())
-        except ValueError:
-            return None
-    return None
-
-def parse_numeric(value: str) -> float | None:
-    if not value or value.strip() == '' or value.strip() == '-':
-        return None
-    try:
-        return float(value.strip().replace(',', ''))
-    except ValueError:
-        return None
+# CSV를 한 번에 읽을 행 수
+CHUNK_SIZE = 5000
+
+# 텍스트 컬럼 (CSV 컬럼명 -> 레코드 키)
+TEXT_COLUMNS = {
+    '식품코드': 'food_code',
+    '대표식품명': 'representative_name',
+    '식품대분류명': 'category',
+    '영양성분함량기준량': 'serving_size_raw',
+}
+
+# 100g당 영양성분 컬럼 (레코드 키 -> CSV 컬럼명)
+NUTRIENT_COLUMNS = {
+    'calories': '에너지(kcal)',
+    'protein': '단백질(g)',
+    'fat': '지방(g)',
+    'carbs': '탄수화물(g)',
+    'sugar': '당류(g)',
+    'fiber': '식이섬유(g)',
+    'sodium': '나트륨(mg)',
+}
+
+# 식품중량 문자열의 첫 숫자 (예: "200g" -> "200")
+_WEIGHT_RE = re.compile(r'([\d.]+)')
+
+def _prepare_chunk(raw: pd.DataFrame) -> pd.DataFrame:
+    """CSV 청크의 중량/영양성분을 열 단위로 숫자 변환 (영양성분은 1인분 기준)"""
+    raw = raw.reindex(columns=['식품명', '식품중량', *TEXT_COLUMNS, *NUTRIENT_COLUMNS.values()], fill_value='')
+
+    raw['식품명'] = raw['식품명'].str.strip()
+    raw = raw[raw['식품명'] != '']
+
+    # 원본 행 번호 (청크 간 첫 등장 순서 비교용)
+    foods = pd.DataFrame({'food_name': raw['식품명'], 'row': raw.index})
+    for column, key in TEXT_COLUMNS.items():
+        foods[key] = raw[column].str.strip()
+
+    # 숫자로 바꿀 수 없으면 NaN
+    foods['food_weight_g'] = pd.to_numeric(raw['식품중량'].str.extract(_WEIGHT_RE, expand=False), errors='coerce')
+
+    # 100g당 값을 1인분으로 변환 (중량이 없으면 100g당 값 그대로)
+    factor = (foods['food_weight_g'] / 100).fillna(1.0)
+    for key, column in NUTRIENT_COLUMNS.items():
+        values = pd.to_numeric(raw[column].str.strip().str.replace(',', '', regex=False), errors='coerce')
+        foods[key] = values * factor
+
+    return foods
+
+def _aggregate(foods: pd.DataFrame, partial: bool) -> pd.DataFrame:
+    """(food_name, 중량)별 행 수/첫 행/첫 행 텍스트/영양성분 합계·개수 집계
+
+    partial=False면 청크별 부분 집계끼리 다시 합침 (합계/개수는 더하고 첫 행은 최솟값)
+    """
+    if not partial:
+        foods = foods.sort_values('first_row', kind='stable')
+    grouped = foods.groupby(['food_name', 'food_weight_g'], sort=False, dropna=False)
+    if partial:
+        aggs = {
+            'count': ('row', 'size'),
+            'first_row': ('row', 'min'),
+            **{key: (key, 'first') for key in TEXT_COLUMNS.values()},
+            **{f'{key}_sum': (key, 'sum') for key in NUTRIENT_COLUMNS},
+            **{f'{key}_n': (key, 'count') for key in NUTRIENT_COLUMNS},
+        }
+    else:
+        aggs = {
+            'count': ('count', 'sum'),
+            'first_row': ('first_row', 'min'),
+            **{key: (key, 'first') for key in TEXT_COLUMNS.values()},
+            **{f'{key}_{stat}': (f'{key}_{stat}', 'sum') for key in NUTRIENT_COLUMNS for stat in ('sum', 'n')},
+        }
+    return grouped.agg(**aggs).reset_index()
+
+def load_foods(csv_path: str) -> pd.DataFrame:
+    """CSV를 CHUNK_SIZE행씩 읽으며 (food_name, 중량)별로 집계 (메모리는 행 수가 아닌 고유 조합 수에 비례)"""
+    columns = ['식품명', '식품중량', *TEXT_COLUMNS, *NUTRIENT_COLUMNS.values()]
+    reader = read_foods_csv(csv_path, columns, chunksize=CHUNK_SIZE)
+    partials = [_aggregate(_prepare_chunk(chunk), partial=True) for chunk in reader]
+    return _aggregate(pd.concat(partials, ignore_index=True), partial=False)
+
+def dedupe_foods(groups: pd.DataFrame) -> pd.DataFrame:
+    """food_name별로 최빈 중량 그룹만 남겨 영양성분 평균 (최빈값이 여러 개면 먼저 나온 중량)"""
+    # 중량이 있는 음식은 최빈 중량 그룹, 중량이 전혀 없는 음식은 중량 없음 그룹 전체 사용
+    mode = (
+        groups.dropna(subset=['food_weight_g'])
+        .sort_values(['count', 'first_row'], ascending=[False, True])
+        .drop_duplicates('food_name')
+    )
+    unweighted = groups[groups['food_weight_g'].isna() & ~groups['food_name'].isin(mode['food_name'])]
+    result = pd.concat([mode, unweighted]).set_index('food_name')
+
+    # 반올림은 고유 음식 수만큼만 하므로 기존과 같은 파이썬 round 사용 (numpy round는 .x5 경계가 다름)
+    for key in NUTRIENT_COLUMNS:
+        mean = result[f'{key}_sum'] / result[f'{key}_n']
+        result[key] = mean.map(lambda v: round(v, 1))
+
+    # 원본에 처음 등장한 순서 유지
+    first_seen = groups.groupby('food_name', sort=False)['first_row'].min().sort_values()
+    return result.reindex(first_seen.index)[[*TEXT_COLUMNS.values(), *NUTRIENT_COLUMNS, 'food_weight_g']]
+
+def to_records(result: pd.DataFrame) -> list[dict]:
+    """Supabase insert용 레코드 목록 (빈 값/NaN은 None)"""
+    weight = result['food_weight_g']
+    has_weight = weight.notna() & (weight != 0)
+    weight_str = weight.where(has_weight, 0).astype(int).astype(str) + 'g'
+
+    records = pd.DataFrame({
+        'food_code': result['food_code'],
+        'food_name': result.index,
+        'representative_name': result['representative_name'].mask(result['representative_name'] == ''),
+        'category': result['category'].mask(result['category'] == ''),
+        **{key: result[key] for key in NUTRIENT_COLUMNS},
+        'serving_size': ('1인분(' + weight_str + ')').where(
+            has_weight, result['serving_size_raw'].mask(result['serving_size_raw'] == '')
+        ),
+        'food_weight': weight_str.where(has_weight),
+    })
+    return records.astype(object).where(records.notna(), None).to_dict(orient='records')
 
 def main():
     print(f"CSV 파일 읽는 중: {CSV_PATH}")
 
-    # food_name 기준으로 그룹화
-    food_groups = defaultdict(list)
-
-    with open(CSV_PATH, 'r', encoding='cp949') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            food_name = row.get('식품명', '').strip()
-            if not food_name:
-                continue
-
-            food_weight_g = extract_number(row.get('식품중량', ''))
-
-            # 100g당 값을 1인분으로 변환
-            def to_serving(val_str):
-                val = parse_numeric(val_str)
-                if val is None or food_weight_g is None:
-                    return val
-                return val * (food_weight_g / 100)
-
-            food_groups[food_name].append({
-                'food_code': row.get('식품코드', '').strip(),
-                'representative_name': row.get('대표식품명', '').strip(),
-                'category': row.get('식품대분류명', '').strip(),
-                'calories': to_serving(row.get('에너지(kcal)', '')),
-                'protein': to_serving(row.get('단백질(g)', '')),
-                'fat': to_serving(row.get('지방(g)', '')),
-                'carbs': to_serving(row.get('탄수화물(g)', '')),
-                'sugar': to_serving(row.get('당류(g)', '')),
-                'fiber': to_serving(row.get('식이섬유(g)', '')),
-                'sodium': to_serving(row.get('나트륨(mg)', '')),
-                'food_weight_g': food_weight_g,
-                'serving_size_raw': row.get('영양성분함량기준량', '').strip(),
-            })
-
-    print(f"총 {len(food_groups)}개 고유 음식명 발견 (원본 {sum(len(v) for v in food_groups.values())}개)")
+    groups = load_foods(CSV_PATH)
+    result = dedupe_foods(groups)
+    print(f"총 {len(result)}개 고유 음식명 발견 (원본 {groups['count'].sum()}개)")
 
     # 최빈값 방식: 가장 많이 등장하는 중량 기준으로 선택
-    records = []
-    for food_name, items in food_groups.items():
-        weights = [item['food_weight_g'] for item in items if item['food_weight_g'] is not None]
-
-        if weights:
-            # 최빈 중량 찾기
-            weight_counter = Counter(weights)
-            most_common_weight = weight_counter.most_common(1)[0][0]
-
-            # 해당 중량을 가진 항목들만 필터링
-            matching_items = [item for item in items if item['food_weight_g'] == most_common_weight]
-        else:
-            matching_items = items
-            most_common_weight = None
-
-        # 필터링된 항목들의 평균값 계산
-        def avg_field(field):
-            values = [item[field] for item in matching_items if item[field] is not None]
-            if not values:
-                return None
-            return round(sum(values) / len(values), 1)
-
-        records.append({
-            'food_code': matching_items[0]['food_code'],
-            'food_name': food_name,
-            'representative_name': matching_items[0]['representative_name'] or None,
-            'category': matching_items[0]['category'] or None,
-            'calories': avg_field('calories'),
-            'protein': avg_field('protein'),
-            'fat': avg_field('fat'),
-            'carbs': avg_field('carbs'),
-            'sugar': avg_field('sugar'),
-            'fiber': avg_field('fiber'),
-            'sodium': avg_field('sodium'),
-            'serving_size': f"1인분({int(most_common_weight)}g)" if most_common_weight else matching_items[0]['serving_size_raw'] or None,
-            'food_weight': f"{int(most_common_weight)}g" if most_common_weight else None,
-        })
+    records = to_records(result)
 
     print(f"\n=== 샘플 데이터 ===")
     for r in records[:5]:
@@ -137,18 +154,12 @@ def main():
     print("기존 foods 테이블 데이터 삭제 중...")
     supabase.table('foods').delete().neq('id', 0).execute()
 
-    # 배치 업로드
-    BATCH_SIZE = 1000
-    total_inserted = 0
-
-    for i in range(0, len(records), BATCH_SIZE):
-        batch = records[i:i + BATCH_SIZE]
-        try:
-            supabase.table('foods').insert(batch).execute()
-            total_inserted += len(batch)
-            print(f"진행: {total_inserted}/{len(records)} ({total_inserted * 100 // len(records)}%)")
-        except Exception as e:
-            print(f"에러 (batch {i // BATCH_SIZE + 1}): {e}")
+    # 배치 업로드 (BATCH_SIZE개씩 동시에 전송, insert는 멱등이 아니라 재시도하지 않음)
+    def insert_batch(n, batch):
+        supabase.table('foods').insert(batch).execute()
+        return len(batch)
+
+    total_inserted = upload_batches(records, insert_batch)
 
     print(f"\n완료! {total_inserted}개 고유 음식 데이터가 저장되었습니다.")
     print(f"(원본 14,584개 → 중복 제거 후 {len(records)}개)")
@@ -3,107 +3,100 @@
 사용법: python scripts/update_serving_calories.py
 """
 
-import csv
-import os
 import re
-import sys
+import pandas as pd
 from supabase import create_client, Client
 
-# .env.local 파일에서 Supabase 설정 읽기
-def load_env():
-    env_path = os.path.join(os.path.dirname(__file__), '..', '.env.local')
-    env_vars = {}
-    if os.path.exists(env_path):
-        with open(env_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key] = value
-    return env_vars
+from _common import (
+    COLUMN_MAPPING,
+    CSV_PATH,
+    NUMERIC_COLUMNS,
+    last_per_food_code,
+    load_env,
+    read_foods_csv,
+    retry_transient,
+    upload_batches,
+)
 
 env_vars = load_env()
 SUPABASE_URL = env_vars.get('VITE_SUPABASE_URL', '')
 SUPABASE_KEY = env_vars.get('VITE_SUPABASE_ANON_KEY', '')
 
-CSV_PATH = r'c:\Users\djgus\Downloads\food_data.csv'
-
-# 컬럼명 매핑
-COLUMN_MAPPING = {
-    '식품코드': 'food_code',
-    '식품명': 'food_name',
-    '대표식품명': 'representative_name',
-    '식품대분류명': 'category',
-    '에너지(kcal)': 'calories',
-    '단백질(g)': 'protein',
-    '지방(g)': 'fat',
-    '탄수화물(g)': 'carbs',
-    '당류(g)': 'sugar',
-    '식이섬유(g)': 'fiber',
-    '나트륨(mg)': 'sodium',
-    '영양성분함량기준량': 'serving_size',
-    '식품중량': 'food_weight',
-}
-
-def extract_number(value: str) -> float | None:
-    """문자열에서 숫자만 추출 (예: '590ml' -> 590.0)"""
-    if not value:
-        return None
-    match = re.search(r'[\d.]+', value.strip())
-    if match:
-        try:
-            return float(match.group())
-        except ValueError:
-            return None
-    return None
-
-def parse_numeric(value: str) -> float | None:
-    """숫자 문자열을 float으로 변환"""
-    if not value or value.strip() == '' or value.strip() == '-':
-        return None
-    try:
-        return float(value.strip().replace(',', ''))
-    except ValueError:
-        return None
-
-def calculate_serving_nutrition(per_100g: float | None, food_weight_g: float | None) -> float | None:
-    """100g당 영양소를 1인분 기준으로 변환"""
-    if per_100g is None or food_weight_g is None:
-        return per_100g  # 변환 불가시 원본 반환
-    return round(per_100g * (food_weight_g / 100), 1)
-
-def process_row(row: dict) -> dict:
-    """CSV 행을 1인분 기준으로 변환된 DB 레코드로 변환"""
-    food_weight_str = row.get('식품중량', '').strip()
-    food_weight_g = extract_number(food_weight_str)
-
-    # 100g당 영양소 값
-    calories_per_100g = parse_numeric(row.get('에너지(kcal)', ''))
-    protein_per_100g = parse_numeric(row.get('단백질(g)', ''))
-    fat_per_100g = parse_numeric(row.get('지방(g)', ''))
-    carbs_per_100g = parse_numeric(row.get('탄수화물(g)', ''))
-    sugar_per_100g = parse_numeric(row.get('당류(g)', ''))
-    fiber_per_100g = parse_numeric(row.get('식이섬유(g)', ''))
-    sodium_per_100g = parse_numeric(row.get('나트륨(mg)', ''))
-
-    # 1인분 기준으로 변환
-    record = {
-        'food_code': row.get('식품코드', '').strip() or None,
-        'food_name': row.get('식품명', '').strip() or None,
-        'representative_name': row.get('대표식품명', '').strip() or None,
-        'category': row.get('식품대분류명', '').strip() or None,
-        'calories': calculate_serving_nutrition(calories_per_100g, food_weight_g),
-        'protein': calculate_serving_nutrition(protein_per_100g, food_weight_g),
-        'fat': calculate_serving_nutrition(fat_per_100g, food_weight_g),
-        'carbs': calculate_serving_nutrition(carbs_per_100g, food_weight_g),
-        'sugar': calculate_serving_nutrition(sugar_per_100g, food_weight_g),
-        'fiber': calculate_serving_nutrition(fiber_per_100g, food_weight_g),
-        'sodium': calculate_serving_nutrition(sodium_per_100g, food_weight_g),
-        'serving_size': f"1인분({int(food_weight_g)}g)" if food_weight_g else row.get('영양성분함량기준량', '').strip() or None,
-        'food_weight': food_weight_str or None,
-    }
-
-    return record
+# 100g당 영양소 컬럼 (CSV 컬럼명 -> DB 컬럼명)
+NUTRIENT_COLUMNS = {csv_col: db_col for csv_col, db_col in COLUMN_MAPPING.items() if db_col in NUMERIC_COLUMNS}
+
+# 식품중량 문자열의 첫 숫자 (예: '590ml' -> '590')
+_WEIGHT_RE = re.compile(r'([\d.]+)')
+
+# 기존 food_code 조회 페이지 크기 (PostgREST 기본 최대 행 수) / 삭제 요청당 food_code 수 (URL 길이 제한)
+FETCH_PAGE_SIZE = 1000
+DELETE_CHUNK_SIZE = 200
+
+def load_records(csv_path: str) -> tuple[list[dict], int]:
+    """CSV를 한 번에 읽어 1인분 기준 DB 레코드로 변환
+
+    Returns:
+        (레코드 목록, food_code/food_name이 없어 스킵한 행 수)
+    """
+    raw = read_foods_csv(csv_path, COLUMN_MAPPING)
+    raw = raw.reindex(columns=list(COLUMN_MAPPING), fill_value='').apply(lambda col: col.str.strip())
+
+    valid = (raw['식품코드'] != '') & (raw['식품명'] != '')
+    skipped = int((~valid).sum())
+    raw = raw[valid]
+
+    # 숫자로 바꿀 수 없으면 NaN
+    food_weight_g = pd.to_numeric(raw['식품중량'].str.extract(_WEIGHT_RE, expand=False), errors='coerce')
+    has_weight = food_weight_g.notna()
+
+    records = pd.DataFrame({
+        'food_code': raw['식품코드'],
+        'food_name': raw['식품명'],
+        'representative_name': raw['대표식품명'].mask(raw['대표식품명'] == ''),
+        'category': raw['식품대분류명'].mask(raw['식품대분류명'] == ''),
+    })
+
+    # 100g당 영양소를 1인분 기준으로 변환 (중량이 없으면 원본 그대로)
+    # 반올림은 기존과 같은 파이썬 round 사용 (numpy round는 .x5 경계가 다름)
+    for csv_col, db_col in NUTRIENT_COLUMNS.items():
+        per_100g = pd.to_numeric(raw[csv_col].str.replace(',', '', regex=False), errors='coerce')
+        per_serving = (per_100g * (food_weight_g / 100)).map(lambda v: round(v, 1))
+        records[db_col] = per_serving.where(has_weight, per_100g)
+
+    # 중량이 0이면 기존처럼 영양성분함량기준량 사용
+    weight_label = food_weight_g.where(has_weight & (food_weight_g != 0), 0).astype(int).astype(str)
+    records['serving_size'] = ('1인분(' + weight_label + 'g)').where(
+        has_weight & (food_weight_g != 0),
+        raw['영양성분함량기준량'].mask(raw['영양성분함량기준량'] == ''),
+    )
+    records['food_weight'] = raw['식품중량'].mask(raw['식품중량'] == '')
+
+    records = records.astype(object).where(records.notna(), None).to_dict(orient='records')
+    return records, skipped
+
+def delete_stale_foods(supabase: Client, keep_codes: set[str]) -> int:
+    """CSV에 없는 food_code 행만 삭제 (전체 삭제 후 재삽입하면 업로드 동안 테이블이 비어 있음)
+
+    Returns:
+        삭제된 레코드 수
+    """
+    existing = []
+    start = 0
+    while True:
+        page = retry_transient(
+            lambda: supabase.table('foods').select('food_code').order('id')
+            .range(start, start + FETCH_PAGE_SIZE - 1).execute()
+        ).data
+        existing.extend(row['food_code'] for row in page)
+        if len(page) < FETCH_PAGE_SIZE:
+            break
+        start += FETCH_PAGE_SIZE
+
+    stale = [code for code in existing if code not in keep_codes]
+    for i in range(0, len(stale), DELETE_CHUNK_SIZE):
+        chunk = stale[i:i + DELETE_CHUNK_SIZE]
+        retry_transient(lambda: supabase.table('foods').delete().in_('food_code', chunk).execute())
+    return len(stale)
 
 def main():
     print(f"CSV 파일 읽는 중: {CSV_PATH}")
@@ -111,21 +104,8 @@ def main():
     # Supabase 클라이언트 생성
     supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-    # 기존 데이터 삭제
-    print("기존 데이터 삭제 중...")
-    supabase.table('foods').delete().neq('id', 0).execute()
-
     # CSV 파일 읽기 (CP949 인코딩)
-    records = []
-    skipped = 0
-    with open(CSV_PATH, 'r', encoding='cp949') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            record = process_row(row)
-            if record.get('food_code') and record.get('food_name'):
-                records.append(record)
-            else:
-                skipped += 1
+    records, skipped = load_records(CSV_PATH)
 
     print(f"총 {len(records)}개 레코드 로드됨 (스킵: {skipped}개)")
 
@@ -135,20 +115,20 @@ def main():
         print(f"{r['food_name'][:15]:15} | {r['serving_size']:15} | 칼로리: {r['calories']}kcal")
     print()
 
-    # 배치 업로드 (1000개씩)
-    BATCH_SIZE = 1000
-    total_inserted = 0
+    records = last_per_food_code(records)
+
+    def upsert_batch(n, batch):
+        retry_transient(lambda: supabase.table('foods').upsert(batch, on_conflict='food_code').execute())
+        return len(batch)
+
+    # 배치 업로드 (BATCH_SIZE개씩 동시에 전송)
+    total_inserted = upload_batches(records, upsert_batch)
 
-    for i in range(0, len(records), BATCH_SIZE):
-        batch = records[i:i + BATCH_SIZE]
-        try:
-            supabase.table('foods').upsert(batch, on_conflict='food_code').execute()
-            total_inserted += len(batch)
-            print(f"진행: {total_inserted}/{len(records)} ({total_inserted * 100 // len(records)}%)")
-        except Exception as e:
-            print(f"에러 발생 (batch {i // BATCH_SIZE + 1}): {e}")
+    # CSV에서 빠진 기존 데이터 삭제 (upsert가 끝난 뒤라 조회 중인 음식은 계속 존재)
+    print("CSV에 없는 기존 데이터 삭제 중...")
+    deleted = delete_stale_foods(supabase, {r['food_code'] for r in records})
 
-    print(f"\n완료! 총 {total_inserted}개 레코드가 1인분 기준으로 업데이트되었습니다.")
+    print(f"\n완료! 총 {total_inserted}개 레코드가 1인분 기준으로 업데이트되었습니다. (삭제: {deleted}개)")
 
 if __name__ == '__main__':
     main()
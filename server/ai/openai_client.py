@@ -2,14 +2,32 @@
 OpenAI client configuration
 """
 from functools import lru_cache
-from openai import AsyncOpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
 from core.config import settings
 
 
 @lru_cache()
 def get_openai_client() -> AsyncOpenAI:
-    """Get cached OpenAI client instance"""
-    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    """Get cached OpenAI client instance
+
+    Uses an HTTP/2 connection pool so concurrent requests (intent
+    classification + completion per chat turn) share connections.
+    """
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        ),
+    )
+
+
+@lru_cache()
+def get_sync_openai_client() -> OpenAI:
+    """Get cached synchronous OpenAI client instance (for blocking code paths)"""
+    return OpenAI(api_key=settings.OPENAI_API_KEY)
 
 
 def get_client() -> AsyncOpenAI:
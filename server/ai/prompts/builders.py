@@ -3,22 +3,23 @@ Prompt builders for each intent type
 """
 from typing import Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from .personas import PERSONAS, CoachPersona
 
 
-@dataclass
+@dataclass(slots=True)
 class WeightRecord:
     date: str
     weight: float
 
 
-@dataclass
+@dataclass(slots=True)
 class DailyCalorieRecord:
     date: str
     calories: int
 
 
-@dataclass
+@dataclass(slots=True)
 class UserContext:
     """User context data for prompts"""
     today: str
@@ -250,6 +251,12 @@ def build_stats_prompt(persona: CoachPersona, context: UserContext) -> str:
 
 def build_modify_prompt(persona: CoachPersona, context: UserContext) -> str:
     """Build prompt for modify/delete (modify intent)"""
+    return _build_modify_prompt(persona, context.today)
+
+
+@lru_cache(maxsize=32)
+def _build_modify_prompt(persona: CoachPersona, today: str) -> str:
+    """Modify prompt only depends on persona and date, so cache it"""
     return f"""{PERSONAS[persona]}
 
 [임무] 사용자의 식단 기록을 수정/삭제하고 캐릭터답게 반응해!
@@ -268,7 +275,7 @@ def build_modify_prompt(persona: CoachPersona, context: UserContext) -> str:
 - 실수해도 괜찮다는 따뜻한 반응
 - 더 건강한 선택이면 칭찬
 
-오늘 날짜: {context.today}
+오늘 날짜: {today}
 
 [칼로리 추정]
 밥300, 치킨450, 라면500, 샐러드200, 피자280, 삼겹살550"""
@@ -354,8 +361,9 @@ def build_analyze_prompt(persona: CoachPersona, context: UserContext) -> str:
 - 유지 중: 안정적! 꾸준함 칭찬"""
 
 
+@lru_cache(maxsize=None)
 def build_chat_prompt(persona: CoachPersona) -> str:
-    """Build prompt for casual chat (chat intent)"""
+    """Build prompt for casual chat (chat intent, static per persona so cached)"""
     return f"""{PERSONAS[persona]}
 
 [임무] 친근한 대화 상대이자 다이어트 응원단!
@@ -2,7 +2,10 @@
 Intent classifier - Step 1 of 2-step AI call
 Classifies user message into 6 categories
 """
-from typing import Literal
+import re
+import time
+from collections import OrderedDict
+from typing import Literal, Optional
 from openai import AsyncOpenAI
 
 ChatIntent = Literal["log", "query", "stats", "modify", "analyze", "chat"]
@@ -32,15 +35,55 @@ CLASSIFIER_PROMPT = """사용자 메시지를 6가지 중 하나로 분류. 영
 "체중 변화 어때?" → stats
 "이번주 얼마나 먹었어?" → stats
 "점심 삭제해줘" → modify
+"치킨 대신 피자 먹었어" → modify
+"수정과 먹었어" → log
+"말고기 먹었어" → log
 "오늘 잘 먹었어?" → analyze
 "안녕" → chat"""
 
 VALID_INTENTS = {"log", "query", "stats", "modify", "analyze", "chat"}
 
+# Correction phrasings; 수정/말고 only as verbs so foods like 수정과, 말고기 stay logs
+_CORRECTION = r"삭제|지워|지우|바꿔|대신|수정\s*해|말고\s"
+
+# Local fast-path rules (same criteria as CLASSIFIER_PROMPT, unambiguous phrasings only)
+_RULES: tuple[tuple[re.Pattern, ChatIntent], ...] = (
+    (re.compile(_CORRECTION), "modify"),
+    (re.compile(r"뭐\s*먹었"), "query"),
+    (re.compile(r"몇\s*칼로리|칼로리\s*(얼마|몇)|얼마나\s*먹었"), "stats"),
+    (re.compile(r"평가해|뭐\s*먹을까"), "analyze"),
+    # "치킨 먹었어" (not a question, no 뭐/얼마나/잘/안 먹..., not a correction like "A 대신 B 먹었어")
+    (re.compile(rf"^(?!.*(뭐|얼마나|잘|몇|언제|안\s*먹|못\s*먹|{_CORRECTION})).+(먹었어|먹었음|먹음|먹었다)[\s.!~ㅎㅋ]*$"), "log"),
+    (re.compile(r"^(안녕(하세요)?|하이|hi|hello|고마워(요)?|감사(합니다|해요)?|ㅎㅇ)[\s.!~ㅎㅋ]*$", re.IGNORECASE), "chat"),
+)
+
+
+# LRU cache of AI-classified short messages ("오늘 칼로리", "뭐 먹지" are sent repeatedly)
+# The intent depends only on the text, so entries are shared by all users;
+# the TTL bounds how long a cached answer outlives prompt/model changes
+_CACHE_MAX_SIZE = 2048
+_CACHE_MAX_MESSAGE_LEN = 64
+_CACHE_TTL = 600.0
+_intent_cache: "OrderedDict[str, tuple[float, ChatIntent]]" = OrderedDict()
+
+
+def match_intent_rules(message: str) -> Optional[ChatIntent]:
+    """
+    Classify obvious messages locally without an API call
+
+    Returns:
+        Intent if exactly one rule matches, otherwise None (use the AI classifier)
+    """
+    message = message.strip()
+    matched = {intent for pattern, intent in _RULES if pattern.search(message)}
+    if len(matched) == 1:
+        return matched.pop()
+    return None
+
 
 async def classify_intent(client: AsyncOpenAI, message: str) -> ChatIntent:
     """
-    Classify user message intent using AI
+    Classify user message intent (local rules first, AI for the rest)
 
     Args:
         client: OpenAI client
@@ -49,6 +92,19 @@ async def classify_intent(client: AsyncOpenAI, message: str) -> ChatIntent:
     Returns:
         Classified intent
     """
+    intent = match_intent_rules(message)
+    if intent is not None:
+        return intent
+
+    cache_key = message.strip().lower()
+    cacheable = len(cache_key) <= _CACHE_MAX_MESSAGE_LEN
+    if cacheable and cache_key in _intent_cache:
+        cached_at, cached_intent = _intent_cache[cache_key]
+        if time.monotonic() - cached_at < _CACHE_TTL:
+            _intent_cache.move_to_end(cache_key)
+            return cached_intent
+        del _intent_cache[cache_key]
+
     try:
         response = await client.chat.completions.create(
             model="gpt-4o-mini",
@@ -64,6 +120,10 @@ async def classify_intent(client: AsyncOpenAI, message: str) -> ChatIntent:
         if result:
             result = result.strip().lower()
             if result in VALID_INTENTS:
+                if cacheable:
+                    _intent_cache[cache_key] = (time.monotonic(), result)  # type: ignore
+                    if len(_intent_cache) > _CACHE_MAX_SIZE:
+                        _intent_cache.popitem(last=False)
                 return result  # type: ignore
 
         return "chat"
@@ -3,7 +3,7 @@ OpenAI Function Calling tool definitions
 """
 from datetime import date
 from typing import Optional
-import json
+import orjson
 
 from ai.prompts.classifier import ChatIntent
 
@@ -165,16 +165,17 @@ UPDATE_MEAL_TOOL = {
 }
 
 
-def get_tools_for_intent(intent: ChatIntent) -> list[dict]:
-    """Get tools for a given intent"""
-    if intent == "log":
-        return [LOG_MEAL_TOOL]
-    elif intent == "query":
-        return [GET_MEALS_TOOL]
-    elif intent == "modify":
-        return [DELETE_MEAL_TOOL, UPDATE_MEAL_TOOL, LOG_MEAL_TOOL]
-    else:
-        return []
+# Tools per intent (other intents use no tools)
+_INTENT_TOOLS: dict[str, tuple[dict, ...]] = {
+    "log": (LOG_MEAL_TOOL,),
+    "query": (GET_MEALS_TOOL,),
+    "modify": (DELETE_MEAL_TOOL, UPDATE_MEAL_TOOL, LOG_MEAL_TOOL),
+}
+
+
+def get_tools_for_intent(intent: ChatIntent) -> tuple[dict, ...]:
+    """Get tools for a given intent (shared tuple, do not mutate)"""
+    return _INTENT_TOOLS.get(intent, ())
 
 
 # Argument parsing functions
@@ -208,10 +209,18 @@ def deduplicate_foods(foods: list[dict]) -> list[dict]:
     return result
 
 
+def _load_args(args_string: str) -> dict:
+    """Decode function-call arguments (empty/truncated strings fail without running the parser)"""
+    args_string = args_string.strip()
+    if not (args_string.startswith("{") and args_string.endswith("}")):
+        raise ValueError("Function arguments are not a JSON object")
+    return orjson.loads(args_string)
+
+
 def parse_log_meal_args(args_string: str) -> Optional[dict]:
     """Parse log_meal function arguments"""
     try:
-        args = json.loads(args_string)
+        args = _load_args(args_string)
 
         if not args.get("meal_type") or not args.get("foods"):
             return None
@@ -219,21 +228,15 @@ def parse_log_meal_args(args_string: str) -> Optional[dict]:
         if not args.get("date"):
             args["date"] = get_today_local()
 
-        # Set defaults for each food
-        foods = [
-            {
-                "name": food.get("name", ""),
-                "quantity": food.get("quantity", 1),
-                "calories": food.get("calories", 0),
-                "protein": food.get("protein", 0),
-                "carbs": food.get("carbs", 0),
-                "fat": food.get("fat", 0),
-            }
-            for food in args["foods"]
-        ]
+        # Set defaults for each food (in place; log_meal_directly picks only the fields it needs)
+        for food in args["foods"]:
+            food.setdefault("name", "")
+            food.setdefault("quantity", 1)
+            for key in ("calories", "protein", "carbs", "fat"):
+                food.setdefault(key, 0)
 
         # Remove duplicate/subset foods
-        args["foods"] = deduplicate_foods(foods)
+        args["foods"] = deduplicate_foods(args["foods"])
 
         return args
     except Exception:
@@ -243,7 +246,7 @@ def parse_log_meal_args(args_string: str) -> Optional[dict]:
 def parse_get_meals_args(args_string: str) -> dict:
     """Parse get_meals function arguments"""
     try:
-        args = json.loads(args_string)
+        args = _load_args(args_string)
         return {
             "date": args.get("date", get_today_local()),
             "meal_type": args.get("meal_type", "all"),
@@ -255,7 +258,7 @@ def parse_get_meals_args(args_string: str) -> dict:
 def parse_delete_meal_args(args_string: str) -> Optional[dict]:
     """Parse delete_meal function arguments"""
     try:
-        args = json.loads(args_string)
+        args = _load_args(args_string)
         if not args.get("meal_type"):
             return None
         return {
@@ -270,7 +273,7 @@ def parse_delete_meal_args(args_string: str) -> Optional[dict]:
 def parse_update_meal_args(args_string: str) -> Optional[dict]:
     """Parse update_meal function arguments"""
     try:
-        args = json.loads(args_string)
+        args = _load_args(args_string)
         if not args.get("meal_type") or not args.get("old_food_name") or not args.get("new_food"):
             return None
         return {
@@ -1,7 +1,9 @@
 """
 Diet chatbot API endpoints
 """
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Literal
 
@@ -10,11 +12,12 @@ from core.database import get_supabase
 from ai.openai_client import get_client
 from services.chat_service import (
     process_message,
+    stream_message,
     get_chat_history as get_history,
     clear_chat_history as clear_history,
 )
 
-router = APIRouter(prefix="/chat", tags=["Diet Chat"])
+router = APIRouter(prefix="/chat", tags=["Diet Chat"], default_response_class=ORJSONResponse)
 
 
 class ChatRequest(BaseModel):
@@ -68,6 +71,43 @@ async def send_message(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/stream")
+async def send_message_stream(
+    request: ChatRequest,
+    user: TokenData = Depends(get_current_user)
+):
+    """
+    Process diet chatbot message with Server-Sent Events streaming
+
+    Events:
+        data: {"delta": "..."}  response chunk
+        data: {"done": true, "intent": "...", "action_result": {...}}  final event
+        data: {"error": "..."}  error while processing
+    """
+    openai_client = get_client()
+    db = get_supabase()
+
+    async def event_stream():
+        try:
+            async for event in stream_message(
+                openai_client=openai_client,
+                db=db,
+                user_id=user.user_id,
+                content=request.content,
+                persona=request.persona,
+            ):
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            print(f"[Chat API] Stream error: {e}")
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/history")
 async def get_chat_history(
     limit: int = 50,
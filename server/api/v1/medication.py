@@ -1,31 +1,40 @@
 """
 Medication RAG chatbot API endpoints
 """
+import asyncio
+from collections import defaultdict
+
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 
 from api.deps import get_current_user, TokenData
 from core.database import get_supabase
+from core.logging import get_logger
+from services.chat_service import save_chat_turn, save_user_message
+from services.user_cache import health_context_cache
 
-router = APIRouter(prefix="/medication", tags=["Medication RAG"])
+router = APIRouter(prefix="/medication", tags=["Medication RAG"], default_response_class=ORJSONResponse)
+logger = get_logger(__name__)
 
-# RAG instance (lazy loaded)
-_rag_initialized = False
+# Health context reuse window (back-to-back questions share one fetch)
+HEALTH_CONTEXT_TTL = 30.0
 
 
-def get_rag_instance():
-    """Get RAG instance with lazy initialization"""
-    global _rag_initialized
+async def get_rag_instance():
+    """Get RAG instance with lazy initialization (loaded off the event loop)"""
     from rag.core import get_rag
     rag = get_rag()
-    if not _rag_initialized:
+    # After the first load this is a plain flag read; initialize() itself is lock-guarded
+    if not rag._initialized:
         try:
-            rag.initialize()
-            _rag_initialized = True
+            # Waits for the startup warm-up if it is still loading
+            await asyncio.to_thread(rag.initialize)
         except FileNotFoundError as e:
-            print(f"[RAG] Warning: {e}")
+            logger.warning(f"RAG not initialized: {e}")
     return rag
 
 
@@ -45,64 +54,91 @@ class MedicationQueryResponse(BaseModel):
 
 
 async def fetch_health_context(user_id: str) -> str:
-    """Fetch user health context for RAG"""
+    """Fetch user health context for RAG (cached per user for a short TTL)"""
+    cached = health_context_cache.get(user_id, "health_context", HEALTH_CONTEXT_TTL)
+    if cached is not None:
+        return cached
+
     db = get_supabase()
     today = date.today().isoformat()
     week_ago = (date.today() - timedelta(days=6)).isoformat()
 
     context_parts = []
 
-    # 1. Profile
-    profile_result = db.table("user_profiles").select(
-        "current_weight_kg, goal_weight_kg, target_calories"
-    ).eq("user_id", user_id).maybe_single().execute()
+    # The supabase client is sync, so run the independent queries in worker threads concurrently
+    profile_result, weight_result, meals_result, meds_result = await asyncio.gather(
+        asyncio.to_thread(
+            db.table("user_profiles").select(
+                "current_weight_kg, goal_weight_kg, target_calories"
+            ).eq("user_id", user_id).maybe_single().execute
+        ),
+        asyncio.to_thread(
+            db.table("progress_logs").select(
+                "date, weight_kg"
+            ).eq("user_id", user_id).gte("date", week_ago).order("date", desc=False).execute
+        ),
+        asyncio.to_thread(
+            db.table("meals").select(
+                "total_calories"
+            ).eq("user_id", user_id).eq("date", today).execute
+        ),
+        asyncio.to_thread(
+            db.table("medications").select(
+                "id, name, dosage, frequency, time_of_day"
+            ).eq("user_id", user_id).eq("is_active", True).execute
+        ),
+    )
 
+    # 1. Profile
     if profile_result.data:
         p = profile_result.data
         context_parts.append(f"현재 체중: {p.get('current_weight_kg')}kg, 목표 체중: {p.get('goal_weight_kg')}kg")
         context_parts.append(f"일일 목표 칼로리: {p.get('target_calories')}kcal")
 
     # 2. Recent weight records
-    weight_result = db.table("progress_logs").select(
-        "date, weight_kg"
-    ).eq("user_id", user_id).gte("date", week_ago).order("date", desc=False).execute()
-
     if weight_result.data:
         weights = weight_result.data
         weight_str = ", ".join([f"{w['date']}: {w['weight_kg']}kg" for w in weights[-5:]])
         context_parts.append(f"최근 체중 기록: {weight_str}")
 
     # 3. Today's calories
-    meals_result = db.table("meals").select(
-        "total_calories"
-    ).eq("user_id", user_id).eq("date", today).execute()
-
     if meals_result.data:
         total_cal = sum(m.get("total_calories", 0) or 0 for m in meals_result.data)
         context_parts.append(f"오늘 섭취 칼로리: {total_cal}kcal")
 
     # 4. Active medications with recent logs
-    meds_result = db.table("medications").select(
-        "id, name, dosage, frequency, time_of_day"
-    ).eq("user_id", user_id).eq("is_active", True).execute()
-
     if meds_result.data:
         med_list = [f"{m['name']} {m.get('dosage', '')} ({m.get('frequency', '')})" for m in meds_result.data]
         context_parts.append(f"복용 중인 약물: {', '.join(med_list)}")
 
-        # Recent medication logs
-        for med in meds_result.data:
-            logs_result = db.table("medication_logs").select(
-                "taken_at, status"
-            ).eq("medication_id", med.get("id")).gte(
+        # Recent medication logs (one query for all medications, last 5 per medication)
+        med_ids = [med.get("id") for med in meds_result.data]
+        logs_result = await asyncio.to_thread(
+            db.table("medication_logs").select(
+                "medication_id, taken_at, status"
+            ).in_("medication_id", med_ids).gte(
                 "taken_at", week_ago
-            ).order("taken_at", desc=True).limit(5).execute()
+            ).order("taken_at", desc=True).execute
+        )
+
+        logs_by_med = defaultdict(list)
+        for log in logs_result.data or []:
+            logs_by_med[log.get("medication_id")].append(log)
+
+        for med in meds_result.data:
+            logs = logs_by_med.get(med.get("id"), [])[:5]
+            if logs:
+                taken_count = sum(1 for l in logs if l.get("status") == "taken")
+                context_parts.append(f"  - {med['name']}: 최근 {len(logs)}회 중 {taken_count}회 복용")
 
-            if logs_result.data:
-                taken_count = sum(1 for l in logs_result.data if l.get("status") == "taken")
-                context_parts.append(f"  - {med['name']}: 최근 {len(logs_result.data)}회 중 {taken_count}회 복용")
+    context = "\n".join(context_parts) if context_parts else ""
+    health_context_cache.set(user_id, "health_context", context)
+    return context
 
-    return "\n".join(context_parts) if context_parts else ""
+
+def save_chat_messages(user_id: str, query: str, answer: str, asked_at: datetime):
+    """Save the question/answer pair to chat_messages"""
+    save_chat_turn(get_supabase(), user_id, "medication", query, answer, asked_at)
 
 
 @router.post("/ask", response_model=MedicationQueryResponse)
@@ -117,8 +153,9 @@ async def ask_medication(
     - Emergency detection
     - Optionally includes user health data context
     """
+    asked_at = datetime.now(timezone.utc)
     try:
-        rag = get_rag_instance()
+        rag = await get_rag_instance()
 
         # Fetch health context if requested
         user_context = ""
@@ -126,7 +163,7 @@ async def ask_medication(
             user_context = await fetch_health_context(user.user_id)
 
         # Query RAG
-        result = rag.ask(
+        result = await rag.aask(
             query=request.query,
             user_context=user_context,
             use_rag=request.use_rag,
@@ -134,20 +171,9 @@ async def ask_medication(
         )
 
         # Save to chat_messages
-        db = get_supabase()
-        db.table("chat_messages").insert({
-            "user_id": user.user_id,
-            "role": "user",
-            "content": request.query,
-            "chat_type": "medication",
-        }).execute()
-
-        db.table("chat_messages").insert({
-            "user_id": user.user_id,
-            "role": "assistant",
-            "content": result["response"],
-            "chat_type": "medication",
-        }).execute()
+        await asyncio.to_thread(
+            save_chat_messages, user.user_id, request.query, result["response"], asked_at
+        )
 
         return MedicationQueryResponse(
             response=result["response"],
@@ -161,10 +187,74 @@ async def ask_medication(
             detail="RAG not initialized. Please run setup scripts first."
         )
     except Exception as e:
-        print(f"[Medication API] Error: {e}")
+        logger.error(f"Medication query failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/ask/stream")
+async def ask_medication_stream(
+    request: MedicationQueryRequest,
+    user: TokenData = Depends(get_current_user)
+):
+    """
+    Process medication-related questions with Server-Sent Events streaming
+
+    Events:
+        data: {"delta": "..."}  response chunk
+        data: {"done": true, "is_emergency": bool, "sources": [...]}  final event
+        data: {"error": "..."}  error while processing
+    """
+    asked_at = datetime.now(timezone.utc)
+    rag = await get_rag_instance()
+    # Status codes can't change once streaming starts, so check readiness first
+    if not rag._initialized:
+        raise HTTPException(
+            status_code=503,
+            detail="RAG not initialized. Please run setup scripts first."
+        )
+
+    user_context = ""
+    if request.include_health_context:
+        user_context = await fetch_health_context(user.user_id)
+
+    async def event_stream():
+        deltas = []
+        save_task = None
+        try:
+            async for event in rag.astream(
+                query=request.query,
+                user_context=user_context,
+                use_rag=request.use_rag,
+                intent=request.intent,
+            ):
+                if "delta" in event:
+                    deltas.append(event["delta"])
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+
+            save_task = asyncio.ensure_future(asyncio.to_thread(
+                save_chat_messages, user.user_id, request.query, "".join(deltas), asked_at
+            ))
+            await asyncio.shield(save_task)
+        except BaseException as e:
+            # Keep the question in history like the diet chat (reply or save failed,
+            # or the client went away; a save still running will write the turn)
+            if save_task is None or (save_task.done() and (save_task.cancelled() or save_task.exception())):
+                await asyncio.shield(asyncio.to_thread(
+                    save_user_message, get_supabase(), user.user_id, "medication", request.query, asked_at
+                ))
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"Medication stream failed: {e}")
+            if save_task is None:
+                yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/history")
 async def get_medication_chat_history(
     limit: int = 50,
@@ -173,13 +263,20 @@ async def get_medication_chat_history(
     """Get medication chat history"""
     try:
         db = get_supabase()
-        result = db.table("chat_messages").select("*").eq(
-            "user_id", user.user_id
-        ).eq("chat_type", "medication").order(
-            "created_at", desc=True
-        ).limit(limit).execute()
+        # Only the fields of the frontend ChatMessage type
+        result = await asyncio.to_thread(
+            db.table("chat_messages").select(
+                "id, user_id, role, content, chat_type, created_at"
+            ).eq(
+                "user_id", user.user_id
+            ).eq("chat_type", "medication").order(
+                "created_at", desc=True
+            ).limit(limit).execute
+        )
 
-        messages = list(reversed(result.data or []))
+        # Latest N come back newest first; flip them in place to chronological order
+        messages = result.data or []
+        messages.reverse()
         return {"messages": messages, "total": len(messages)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -192,9 +289,11 @@ async def clear_medication_chat_history(
     """Clear medication chat history"""
     try:
         db = get_supabase()
-        db.table("chat_messages").delete().eq(
-            "user_id", user.user_id
-        ).eq("chat_type", "medication").execute()
+        await asyncio.to_thread(
+            db.table("chat_messages").delete().eq(
+                "user_id", user.user_id
+            ).eq("chat_type", "medication").execute
+        )
         return {"success": True, "message": "Medication chat history cleared"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
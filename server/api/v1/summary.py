@@ -1,15 +1,36 @@
 """
 Data summary/aggregation API endpoints
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional
 from datetime import date, timedelta
 
 from api.deps import get_current_user, TokenData
 from core.database import get_supabase
+from core.logging import get_logger
+from services.user_cache import summary_cache
 
-router = APIRouter(prefix="/summary", tags=["Data Summary"])
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/summary", tags=["Data Summary"], default_response_class=ORJSONResponse)
+
+# Response reuse windows in seconds (the web client writes straight to Supabase,
+# so only chat meal writes invalidate early; keep these short)
+TODAY_SUMMARY_TTL = 30.0
+PERIOD_SUMMARY_TTL = 60.0
+# target_calories only changes from the profile settings page
+TARGET_CALORIES_TTL = 300.0
+
+# Expected doses per day by medication frequency (unknown values count as once daily)
+DOSES_PER_DAY = {
+    "once_daily": 1,
+    "twice_daily": 2,
+    "three_times_daily": 3,
+    "weekly": 1 / 7,
+}
 
 
 class TodaySummary(BaseModel):
@@ -54,6 +75,26 @@ class MedicationAdherence(BaseModel):
     by_medication: list[dict]
 
 
+async def get_target_calories(db, user_id: str) -> int:
+    """Get the user's target calories (cached for TARGET_CALORIES_TTL)"""
+    cached = summary_cache.get(user_id, "target_calories", TARGET_CALORIES_TTL)
+    if cached is not None:
+        return cached
+
+    profile_result = await asyncio.to_thread(
+        db.table("user_profiles").select(
+            "target_calories"
+        ).eq("user_id", user_id).maybe_single().execute
+    )
+
+    target_calories = 1800  # default
+    if profile_result.data:
+        target_calories = profile_result.data.get("target_calories") or 1800
+
+    summary_cache.set(user_id, "target_calories", target_calories)
+    return target_calories
+
+
 @router.get("/today", response_model=TodaySummary)
 async def get_today_summary(
     user: TokenData = Depends(get_current_user)
@@ -69,19 +110,21 @@ async def get_today_summary(
         db = get_supabase()
         today = date.today().isoformat()
 
-        # Get user profile for target calories
-        profile_result = db.table("user_profiles").select(
-            "target_calories"
-        ).eq("user_id", user.user_id).maybe_single().execute()
-
-        target_calories = 1800  # default
-        if profile_result.data:
-            target_calories = profile_result.data.get("target_calories") or 1800
-
-        # Get today's meals with items
-        meals_result = db.table("meals").select(
-            "id, total_calories, meal_items(calories, protein_g, carbs_g, fat_g)"
-        ).eq("user_id", user.user_id).eq("date", today).execute()
+        cache_key = ("today", today)
+        cached = summary_cache.get(user.user_id, cache_key, TODAY_SUMMARY_TTL)
+        if cached is not None:
+            return cached
+
+        # Get target calories and today's meals with items concurrently
+        # (the supabase client is sync, so each query runs in a worker thread)
+        target_calories, meals_result = await asyncio.gather(
+            get_target_calories(db, user.user_id),
+            asyncio.to_thread(
+                db.table("meals").select(
+                    "id, total_calories, meal_items(calories, protein_g, carbs_g, fat_g)"
+                ).eq("user_id", user.user_id).eq("date", today).execute
+            ),
+        )
 
         meals = meals_result.data or []
 
@@ -98,7 +141,7 @@ async def get_today_summary(
                 carbs_g += item.get("carbs_g") or 0
                 fat_g += item.get("fat_g") or 0
 
-        return TodaySummary(
+        summary = TodaySummary(
             calories_consumed=calories_consumed,
             calories_target=target_calories,
             calories_remaining=max(0, target_calories - calories_consumed),
@@ -108,9 +151,11 @@ async def get_today_summary(
             meals_logged=len(meals),
             date=today,
         )
+        summary_cache.set(user.user_id, cache_key, summary)
+        return summary
 
     except Exception as e:
-        print(f"[Summary API] Error: {e}")
+        logger.exception("[Summary API] Error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -134,47 +179,49 @@ async def get_weekly_summary(
         today_str = today.isoformat()
         week_ago_str = week_ago.isoformat()
 
-        # Get meals for the week
-        meals_result = db.table("meals").select(
-            "date, total_calories"
-        ).eq("user_id", user.user_id).gte(
-            "date", week_ago_str
-        ).lte("date", today_str).execute()
-
-        meals = meals_result.data or []
+        cache_key = ("weekly", today_str)
+        cached = summary_cache.get(user.user_id, cache_key, PERIOD_SUMMARY_TTL)
+        if cached is not None:
+            return cached
+
+        # Get daily calorie totals, weight data and medication adherence for the week concurrently
+        totals_result, weight_result, adherence = await asyncio.gather(
+            asyncio.to_thread(
+                db.rpc("daily_calorie_totals", {
+                    "p_user_id": user.user_id,
+                    "p_start_date": week_ago_str,
+                    "p_end_date": today_str,
+                }).execute
+            ),
+            asyncio.to_thread(
+                db.table("progress_logs").select(
+                    "date, weight_kg"
+                ).eq("user_id", user.user_id).gte(
+                    "date", week_ago_str
+                ).lte("date", today_str).order("date", desc=False).execute
+            ),
+            calculate_medication_adherence(db, user.user_id, 7),
+        )
 
-        # Group by date
-        daily_data = {}
+        # Every day of the week in date order (days without meals are 0)
+        # (fields are a date string and INT columns from daily_calorie_totals,
+        # so the models are built without re-validation)
+        totals_by_date = {row.get("meal_date"): row for row in totals_result.data or []}
+        daily_calories = []
         for d in range(7):
             current_date = (week_ago + timedelta(days=d)).isoformat()
-            daily_data[current_date] = {"calories": 0, "meals_count": 0}
-
-        for meal in meals:
-            meal_date = meal.get("date")
-            if meal_date in daily_data:
-                daily_data[meal_date]["calories"] += meal.get("total_calories") or 0
-                daily_data[meal_date]["meals_count"] += 1
-
-        daily_calories = [
-            DailyCalorie(
-                date=d,
-                calories=daily_data[d]["calories"],
-                meals_count=daily_data[d]["meals_count"],
-            )
-            for d in sorted(daily_data.keys())
-        ]
+            row = totals_by_date.get(current_date, {})
+            daily_calories.append(DailyCalorie.model_construct(
+                date=current_date,
+                calories=row.get("calories") or 0,
+                meals_count=row.get("meals_count") or 0,
+            ))
 
         total_calories = sum(dc.calories for dc in daily_calories)
         days_with_data = sum(1 for dc in daily_calories if dc.calories > 0)
         average_calories = total_calories / days_with_data if days_with_data > 0 else 0
 
-        # Get weight data
-        weight_result = db.table("progress_logs").select(
-            "date, weight_kg"
-        ).eq("user_id", user.user_id).gte(
-            "date", week_ago_str
-        ).lte("date", today_str).order("date", desc=False).execute()
-
+        # Weight change
         weights = weight_result.data or []
         weight_start = weights[0].get("weight_kg") if weights else None
         weight_end = weights[-1].get("weight_kg") if weights else None
@@ -182,10 +229,7 @@ async def get_weekly_summary(
         if weight_start and weight_end:
             weight_change = round(weight_end - weight_start, 1)
 
-        # Get medication adherence
-        adherence = await calculate_medication_adherence(db, user.user_id, 7)
-
-        return WeeklySummary(
+        summary = WeeklySummary(
             daily_calories=daily_calories,
             average_calories=round(average_calories, 1),
             total_calories=total_calories,
@@ -196,9 +240,11 @@ async def get_weekly_summary(
             start_date=week_ago_str,
             end_date=today_str,
         )
+        summary_cache.set(user.user_id, cache_key, summary)
+        return summary
 
     except Exception as e:
-        print(f"[Summary API] Error: {e}")
+        logger.exception("[Summary API] Error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -209,10 +255,16 @@ async def calculate_medication_adherence(
     today = date.today()
     start_date = today - timedelta(days=days - 1)
 
-    # Get active medications
-    meds_result = db.table("medications").select(
-        "id, name, frequency"
-    ).eq("user_id", user_id).eq("is_active", True).execute()
+    # Get active medications with their logs in the period in one round trip
+    # (logs are embedded through the medication_id FK; the taken_at filter applies
+    # to the embedded rows, so medications without logs still come back)
+    meds_result = await asyncio.to_thread(
+        db.table("medications").select(
+            "id, name, frequency, medication_logs(status)"
+        ).eq("user_id", user_id).eq("is_active", True).gte(
+            "medication_logs.taken_at", start_date.isoformat()
+        ).execute
+    )
 
     medications = meds_result.data or []
 
@@ -237,26 +289,12 @@ async def calculate_medication_adherence(
         frequency = med.get("frequency", "once_daily")
 
         # Calculate expected doses
-        doses_per_day = 1
-        if frequency == "twice_daily":
-            doses_per_day = 2
-        elif frequency == "three_times_daily":
-            doses_per_day = 3
-        elif frequency == "weekly":
-            doses_per_day = 1 / 7
-
-        expected_doses = int(doses_per_day * days)
-
-        # Get actual logs
-        logs_result = db.table("medication_logs").select(
-            "status"
-        ).eq("medication_id", med_id).gte(
-            "taken_at", start_date.isoformat()
-        ).execute()
-
-        logs = logs_result.data or []
-        taken = sum(1 for log in logs if log.get("status") == "taken")
-        skipped = sum(1 for log in logs if log.get("status") == "skipped")
+        expected_doses = int(DOSES_PER_DAY.get(frequency, 1) * days)
+
+        # Actual logs
+        statuses = [log.get("status") for log in med.get("medication_logs") or []]
+        taken = statuses.count("taken")
+        skipped = statuses.count("skipped")
 
         med_adherence = (taken / expected_doses * 100) if expected_doses > 0 else 100
 
@@ -296,10 +334,15 @@ async def get_medication_adherence(
     - Adherence percentage per medication
     """
     try:
+        cache_key = ("adherence", date.today().isoformat(), days)
+        cached = summary_cache.get(user.user_id, cache_key, PERIOD_SUMMARY_TTL)
+        if cached is not None:
+            return cached
+
         db = get_supabase()
         result = await calculate_medication_adherence(db, user.user_id, days)
 
-        return MedicationAdherence(
+        adherence = MedicationAdherence(
             days=days,
             total_scheduled=result["total_scheduled"],
             total_taken=result["total_taken"],
@@ -307,9 +350,11 @@ async def get_medication_adherence(
             adherence_rate=result["adherence_rate"],
             by_medication=result["by_medication"],
         )
+        summary_cache.set(user.user_id, cache_key, adherence)
+        return adherence
 
     except Exception as e:
-        print(f"[Summary API] Error: {e}")
+        logger.exception("[Summary API] Error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -367,37 +412,41 @@ async def get_monthly_report(
         last_day_str = last_day.isoformat()
         total_days = (last_day - first_day).days + 1
 
-        # Get meals for the month
-        meals_result = db.table("meals").select(
-            "date, total_calories"
-        ).eq("user_id", user.user_id).gte(
-            "date", first_day_str
-        ).lte("date", last_day_str).execute()
-
-        meals = meals_result.data or []
-
-        # Calculate statistics
-        dates_with_meals = set()
-        total_calories = 0
-        daily_calories = {}
+        cache_key = ("monthly", first_day_str, last_day_str)
+        cached = summary_cache.get(user.user_id, cache_key, PERIOD_SUMMARY_TTL)
+        if cached is not None:
+            return cached
+
+        # Get daily calorie totals, weight data and medication adherence for the month concurrently
+        totals_result, weight_result, adherence = await asyncio.gather(
+            asyncio.to_thread(
+                db.rpc("daily_calorie_totals", {
+                    "p_user_id": user.user_id,
+                    "p_start_date": first_day_str,
+                    "p_end_date": last_day_str,
+                }).execute
+            ),
+            asyncio.to_thread(
+                db.table("progress_logs").select(
+                    "date, weight_kg"
+                ).eq("user_id", user.user_id).gte(
+                    "date", first_day_str
+                ).lte("date", last_day_str).order("date", desc=False).execute
+            ),
+            calculate_medication_adherence(db, user.user_id, total_days),
+        )
 
-        for meal in meals:
-            meal_date = meal.get("date")
-            dates_with_meals.add(meal_date)
-            cal = meal.get("total_calories") or 0
-            total_calories += cal
-            daily_calories[meal_date] = daily_calories.get(meal_date, 0) + cal
+        # Calculate statistics (one row per day with meals)
+        daily_calories = {
+            row.get("meal_date"): row.get("calories") or 0
+            for row in totals_result.data or []
+        }
+        total_calories = sum(daily_calories.values())
 
-        days_logged = len(dates_with_meals)
+        days_logged = len(daily_calories)
         average_daily_calories = total_calories / days_logged if days_logged > 0 else 0
 
-        # Get weight data
-        weight_result = db.table("progress_logs").select(
-            "date, weight_kg"
-        ).eq("user_id", user.user_id).gte(
-            "date", first_day_str
-        ).lte("date", last_day_str).order("date", desc=False).execute()
-
+        # Weight change
         weights = weight_result.data or []
         weight_start = weights[0].get("weight_kg") if weights else None
         weight_end = weights[-1].get("weight_kg") if weights else None
@@ -405,38 +454,24 @@ async def get_monthly_report(
         if weight_start and weight_end:
             weight_change = round(weight_end - weight_start, 1)
 
-        # Get medication adherence
-        adherence = await calculate_medication_adherence(db, user.user_id, total_days)
-
-        # Weekly breakdown
+        # Weekly breakdown (7-day chunks from the first day; the date strings are built once)
         weekly_breakdown = []
-        current_week_start = first_day
-
-        while current_week_start <= last_day:
-            week_end = min(current_week_start + timedelta(days=6), last_day)
-            week_calories = sum(
-                daily_calories.get(
-                    (current_week_start + timedelta(days=d)).isoformat(), 0
-                )
-                for d in range((week_end - current_week_start).days + 1)
-            )
-            week_days = (week_end - current_week_start).days + 1
-            week_logged = sum(
-                1 for d in range(week_days)
-                if (current_week_start + timedelta(days=d)).isoformat() in daily_calories
-            )
+        day_strs = [(first_day + timedelta(days=d)).isoformat() for d in range(total_days)]
+
+        for start in range(0, total_days, 7):
+            week_days = day_strs[start:start + 7]
+            week_calories = sum(daily_calories.get(d, 0) for d in week_days)
+            week_logged = sum(1 for d in week_days if d in daily_calories)
 
             weekly_breakdown.append({
-                "week_start": current_week_start.isoformat(),
-                "week_end": week_end.isoformat(),
+                "week_start": week_days[0],
+                "week_end": week_days[-1],
                 "total_calories": week_calories,
                 "days_logged": week_logged,
                 "average_daily": round(week_calories / week_logged, 1) if week_logged > 0 else 0,
             })
 
-            current_week_start = week_end + timedelta(days=1)
-
-        return MonthlyReport(
+        report = MonthlyReport(
             year=year,
             month=month,
             total_days=total_days,
@@ -449,7 +484,9 @@ async def get_monthly_report(
             medication_adherence=adherence["adherence_rate"],
             weekly_breakdown=weekly_breakdown,
         )
+        summary_cache.set(user.user_id, cache_key, report)
+        return report
 
     except Exception as e:
-        print(f"[Summary API] Monthly report error: {e}")
+        logger.exception("[Summary API] Monthly report error")
         raise HTTPException(status_code=500, detail=str(e))
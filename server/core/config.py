@@ -1,7 +1,7 @@
 """
 Application configuration using Pydantic Settings
 """
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
 
 
@@ -23,9 +23,34 @@ class Settings(BaseSettings):
     # Environment
     DEBUG: bool = True
 
-    @property
+    # Medication RAG 모델/인덱스를 서버 시작 시 미리 로드
+    RAG_WARMUP: bool = True
+
+    # Medication RAG 응답/질문 임베딩 캐시 (RAG_CACHE_DB가 비어 있으면 메모리만 사용)
+    RAG_CACHE_SIZE: int = 256
+    RAG_CACHE_DB: str = ""
+    # 표현만 다른 질문의 시맨틱 캐시 (기본 끔, 건강 정보가 없는 질문에만 적용)
+    RAG_SEMANTIC_CACHE: bool = False
+    RAG_SEMANTIC_CACHE_THRESHOLD: float = 0.92  # 비슷한 질문으로 볼 코사인 유사도
+
+    # 동시 요청의 질문 임베딩 마이크로 배치 (최대 개수 / 첫 요청 후 대기 시간(초))
+    RAG_EMBED_BATCHING: bool = True
+    RAG_EMBED_MAX_BATCH_SIZE: int = 32
+    RAG_EMBED_MAX_BATCH_HOLD: float = 0.01
+
+    # int8 양자화 bge-m3 ONNX 폴더 (medication-rag/quantize_embedding.py 결과, 비어 있으면 FP32)
+    RAG_ONNX_EMBED_DIR: str = ""
+
+    # 검색 후보 RAG_RERANK_CANDIDATES개를 cross-encoder로 재정렬해 상위 RAG_RERANK_TOP_N개만 LLM에 전달
+    # (CPU에서는 재정렬 비용이 LLM 절약분보다 클 수 있어 기본은 끔)
+    RAG_RERANK: bool = False
+    RAG_RERANK_MODEL: str = "BAAI/bge-reranker-v2-m3"
+    RAG_RERANK_CANDIDATES: int = 20
+    RAG_RERANK_TOP_N: int = 3
+
+    @cached_property
     def cors_origins_list(self) -> list[str]:
-        """Parse CORS origins from comma-separated string"""
+        """Parse CORS origins from comma-separated string (parsed once)"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
     class Config:
@@ -2,7 +2,7 @@
 Custom exceptions and global exception handlers
 """
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 import traceback
@@ -90,7 +90,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(AppException)
     async def app_exception_handler(request: Request, exc: AppException):
         logger.error(f"AppException: {exc.error_code} - {exc.message}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content=error_response(
                 error=exc.message,
@@ -102,7 +102,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
         logger.warning(f"HTTPException: {exc.status_code} - {exc.detail}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content=error_response(
                 error=str(exc.detail),
@@ -121,7 +121,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
             for err in errors
         ]
         logger.warning(f"ValidationError: {len(errors)} error(s)")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=422,
             content=error_response(
                 error="Request validation failed",
@@ -139,7 +139,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
         from core.config import settings
         error_msg = str(exc) if settings.DEBUG else "Internal server error"
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content=error_response(
                 error=error_msg,
@@ -1,13 +1,31 @@
 """
 Logging configuration for the application
 """
+import atexit
 import logging
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Optional
 
 from core.config import settings
 
+# Background thread that writes queued records to the log files
+_file_listener: Optional[QueueListener] = None
+
+
+def _stop_file_listener() -> None:
+    """Flush queued records and stop the file writer thread"""
+    global _file_listener
+    if _file_listener is not None:
+        _file_listener.stop()
+        _file_listener = None
+
+
+atexit.register(_stop_file_listener)
+
 
 class ColorFormatter(logging.Formatter):
     """Custom formatter with colors for console output"""
@@ -29,7 +47,8 @@ class ColorFormatter(logging.Formatter):
 
 
 def setup_logging() -> logging.Logger:
-    """Configure application logging"""
+    """Configure application logging (file writes happen on a background thread)"""
+    global _file_listener
 
     # Create logs directory if it doesn't exist
     log_dir = Path(__file__).parent.parent / "logs"
@@ -41,6 +60,7 @@ def setup_logging() -> logging.Logger:
 
     # Clear existing handlers
     root_logger.handlers.clear()
+    _stop_file_listener()
 
     # Console handler with colors
     console_handler = logging.StreamHandler(sys.stdout)
@@ -58,7 +78,6 @@ def setup_logging() -> logging.Logger:
     file_handler.setLevel(logging.DEBUG)
     file_format = "%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s"
     file_handler.setFormatter(logging.Formatter(file_format))
-    root_logger.addHandler(file_handler)
 
     # Error file handler
     error_handler = logging.FileHandler(
@@ -67,7 +86,12 @@ def setup_logging() -> logging.Logger:
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(logging.Formatter(file_format))
-    root_logger.addHandler(error_handler)
+
+    # Request code only enqueues records; the listener thread does the disk I/O
+    log_queue: queue.Queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    _file_listener = QueueListener(log_queue, file_handler, error_handler, respect_handler_level=True)
+    _file_listener.start()
 
     # Reduce noise from third-party libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -1,6 +1,9 @@
 """
 Security utilities for JWT token verification
 """
+import hashlib
+import time
+from collections import OrderedDict
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
@@ -10,6 +13,11 @@ from .config import settings
 # HTTP Bearer token scheme
 security = HTTPBearer(auto_error=False)
 
+# Verified tokens: token digest -> (TokenData, exp), LRU-bounded
+# (clients send the same token on every request until it is refreshed)
+_TOKEN_CACHE_SIZE = 10000
+_token_cache: "OrderedDict[bytes, tuple[TokenData, float]]" = OrderedDict()
+
 
 class TokenData:
     """Decoded token data"""
@@ -37,6 +45,16 @@ async def verify_supabase_token(
 
     token = credentials.credentials
 
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        token_data, exp = cached
+        if exp > time.time():
+            _token_cache.move_to_end(cache_key)
+            return token_data
+        # Expired: decode again below so the usual 401 is raised
+        del _token_cache[cache_key]
+
     try:
         # Decode and verify JWT
         payload = jwt.decode(
@@ -53,12 +71,20 @@ async def verify_supabase_token(
                 detail="Invalid token: missing user ID"
             )
 
-        return TokenData(
+        token_data = TokenData(
             user_id=user_id,
             email=payload.get("email"),
             role=payload.get("role")
         )
 
+        exp = payload.get("exp")
+        if exp is not None:
+            _token_cache[cache_key] = (token_data, float(exp))
+            if len(_token_cache) > _TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+
+        return token_data
+
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
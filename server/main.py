@@ -4,12 +4,14 @@ DietRx Coach - FastAPI Backend Server
 Main entry point for the integrated backend API.
 """
 import sys
+import threading
 from pathlib import Path
 
 # Add server directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
@@ -23,6 +25,16 @@ setup_logging()
 logger = get_logger(__name__)
 
 
+def warm_up_rag():
+    """Load the medication RAG model and index ahead of the first request"""
+    try:
+        from rag.core import get_rag
+        get_rag().warm_up()
+        logger.info("Medication RAG warmed up")
+    except Exception as e:
+        logger.warning(f"Medication RAG warm-up skipped: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
@@ -30,6 +42,10 @@ async def lifespan(app: FastAPI):
     logger.info("Starting DietRx Coach API server...")
     logger.info(f"Debug mode: {settings.DEBUG}")
     logger.info(f"CORS origins: {settings.cors_origins_list}")
+    # Warm up in a daemon thread so startup and /health are not blocked
+    # (not the default executor: shutdown would join it until the model loads)
+    if settings.RAG_WARMUP:
+        threading.Thread(target=warm_up_rag, name="rag-warmup", daemon=True).start()
     yield
     # Shutdown
     logger.info("Shutting down server...")
@@ -41,6 +57,7 @@ app = FastAPI(
     description="AI-powered diet coaching platform backend",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
 )
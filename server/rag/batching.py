@@ -0,0 +1,65 @@
+"""
+임베딩 요청 마이크로 배치
+- 동시에 들어온 질문 임베딩 요청을 짧게(max_batch_hold) 모아 한 번의 배치 forward로 처리
+- 토크나이저/메모리 할당 비용을 요청 수만큼이 아니라 배치당 한 번만 지불
+"""
+
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+
+class EmbeddingBatcher:
+    """질문 임베딩 마이크로 배치 처리기 (이벤트 루프당 소비 태스크 1개)"""
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 32,
+        max_batch_hold: float = 0.01,
+    ):
+        self._embed_batch = embed_batch  # 블로킹 배치 임베딩 함수 (스레드에서 실행)
+        self.max_batch_size = max_batch_size
+        self.max_batch_hold = max_batch_hold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def embed(self, text: str) -> List[float]:
+        """임베딩 요청을 큐에 넣고 배치 결과를 기다림"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _run(self):
+        """첫 요청 후 max_batch_hold 동안(최대 max_batch_size개) 모아서 한 번에 임베딩"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_batch_hold
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await asyncio.to_thread(self._embed_batch, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():  # 요청 측이 취소한 경우 무시
+                    future.set_result(vector)
@@ -0,0 +1,226 @@
+"""
+RAG 응답 캐시
+- 같은 질문(질문 + 건강 데이터 + 옵션)은 LLM 호출 없이 저장된 응답 반환
+- 프로세스 내 LRU + 선택적 SQLite 영구 저장 (서버 재시작 후에도 유지)
+- 표현만 다른 질문은 임베딩 유사도로 찾는 시맨틱 캐시
+- 같은 질문 문자열의 임베딩 캐시 (bge-m3 forward 생략)
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+
+def _connect(db_path: str, create_sql: str) -> sqlite3.Connection:
+    """SQLite 캐시 연결 (테이블이 없으면 생성)"""
+    db = sqlite3.connect(db_path, check_same_thread=False)
+    db.execute(create_sql)
+    db.commit()
+    return db
+
+
+class ResponseCache:
+    """질문 → 응답 dict 캐시 (응급 상황 응답은 저장하지 않음, 호출 측에서 판단)"""
+
+    def __init__(self, maxsize: int = 256, db_path: str = ""):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            self._db = _connect(
+                db_path,
+                "CREATE TABLE IF NOT EXISTS rag_cache ("
+                "key BLOB PRIMARY KEY, response TEXT NOT NULL, sources TEXT NOT NULL, ts INTEGER NOT NULL)",
+            )
+
+    @staticmethod
+    def make_key(query: str, user_context: str, use_rag: bool, intent: str) -> bytes:
+        """캐시 키 (16바이트 blake2b)"""
+        raw = "\0".join((query.strip(), user_context, "rag" if use_rag else "llm", intent))
+        return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        """저장된 응답 반환 (메모리 → SQLite 순으로 조회, 없으면 None)"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return result
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT response, sources FROM rag_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            result = {"response": row[0], "is_emergency": False, "sources": json.loads(row[1])}
+            self._remember(key, result)
+            return result
+
+    def set(self, key: bytes, result: dict):
+        """응답 저장"""
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO rag_cache VALUES (?, ?, ?, ?)",
+                    (key, result["response"], json.dumps(result["sources"], ensure_ascii=False), int(time.time())),
+                )
+                self._db.commit()
+
+    def _remember(self, key: bytes, result: dict):
+        """메모리 LRU에 추가 (가장 오래 안 쓴 항목부터 제거)"""
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+class EmbeddingCache:
+    """문자열 → 임베딩 캐시 (메모리 LRU는 float32, SQLite에는 float16으로 절반 크기 저장)"""
+
+    def __init__(self, maxsize: int = 1024, db_path: str = ""):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            self._db = _connect(
+                db_path,
+                "CREATE TABLE IF NOT EXISTS embedding_cache (hash BLOB PRIMARY KEY, vec BLOB NOT NULL)",
+            )
+
+    @staticmethod
+    def make_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """저장된 임베딩 반환 (없으면 None)"""
+        key = self.make_key(text)
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is not None:
+                self._entries.move_to_end(key)
+                return vec.tolist()
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT vec FROM embedding_cache WHERE hash = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            vec = np.frombuffer(row[0], dtype=np.float16).astype(np.float32)
+            self._remember(key, vec)
+            return vec.tolist()
+
+    def set(self, text: str, embedding: List[float]):
+        """임베딩 저장"""
+        key = self.make_key(text)
+        vec = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vec)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embedding_cache VALUES (?, ?)",
+                    (key, vec.astype(np.float16).tobytes()),
+                )
+                self._db.commit()
+
+    def _remember(self, key: bytes, vec: np.ndarray):
+        self._entries[key] = vec
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+# 시맨틱 캐시 비교 범위에 넣는 약물명 (별칭 → 대표 이름)
+_DRUG_ALIASES = {
+    "위고비": "semaglutide",
+    "wegovy": "semaglutide",
+    "세마글루티드": "semaglutide",
+    "semaglutide": "semaglutide",
+    "마운자로": "tirzepatide",
+    "mounjaro": "tirzepatide",
+    "터제파타이드": "tirzepatide",
+    "티르제파타이드": "tirzepatide",
+    "tirzepatide": "tirzepatide",
+}
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+class SemanticCache:
+    """비슷한 질문 응답 캐시 (질문 임베딩 코사인 유사도 ≥ threshold, 메모리 전용)
+
+    "위고비 부작용 알려줘" / "위고비의 부작용은?"처럼 표현만 다른 질문을 같은 응답으로 처리.
+    건강 데이터/옵션이 다르면 답도 달라지므로 scope가 같은 항목끼리만 비교.
+    임베딩이 비슷해도 약물명이나 숫자(용량 등)가 다르면 다른 질문이라 scope에 포함.
+    """
+
+    def __init__(self, threshold: float = 0.92, maxsize: int = 256):
+        self.threshold = threshold
+        self._maxsize = maxsize
+        self._matrix: Optional[np.ndarray] = None  # (maxsize, dim) 정규화된 질문 임베딩 (링 버퍼)
+        self._scopes: List[Optional[bytes]] = [None] * maxsize
+        self._results: List[Optional[dict]] = [None] * maxsize
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_scope(query: str, user_context: str, use_rag: bool, intent: str) -> bytes:
+        """비교 범위 키 (질문의 약물명/숫자 + 질문을 뺀 나머지 입력)"""
+        query_lower = query.lower()
+        drugs = sorted({name for alias, name in _DRUG_ALIASES.items() if alias in query_lower})
+        numbers = sorted(set(_NUMBER_RE.findall(query_lower)))
+        raw = "\0".join((
+            ",".join(drugs),
+            ",".join(numbers),
+            user_context,
+            "rag" if use_rag else "llm",
+            intent,
+        ))
+        return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        return vec / np.linalg.norm(vec)
+
+    def get(self, embedding, scope: bytes) -> Optional[dict]:
+        """가장 비슷한 질문의 응답 반환 (threshold 미만이면 None)"""
+        with self._lock:
+            if self._matrix is None:
+                return None
+            mask = np.fromiter((s == scope for s in self._scopes), dtype=bool, count=self._maxsize)
+            if not mask.any():
+                return None
+            scores = np.where(mask, self._matrix @ self._normalize(embedding), -1.0)
+            best = int(scores.argmax())
+            if scores[best] < self.threshold:
+                return None
+            return self._results[best]
+
+    def set(self, embedding, scope: bytes, result: dict):
+        """응답 저장 (가득 차면 가장 오래된 항목을 덮어씀)"""
+        vec = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self._maxsize, vec.shape[0]), dtype=np.float32)
+            slot = self._next
+            self._matrix[slot] = vec
+            self._scopes[slot] = scope
+            self._results[slot] = result
+            self._next = (slot + 1) % self._maxsize
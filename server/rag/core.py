@@ -4,15 +4,28 @@ Medication RAG Core Module
 - 응급 상황 감지 및 의료 안전 가드레일 포함
 """
 
+import asyncio
 import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick 미설치 환경은 튜플 순회로 대체
+    ahocorasick = None
+import torch
 from llama_index.core import StorageContext, load_index_from_storage, Settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import QueryBundle
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.openai import OpenAI
 
+from ai.openai_client import get_openai_client, get_sync_openai_client
 from core.config import settings
+from rag.batching import EmbeddingBatcher
+from rag.cache import EmbeddingCache, ResponseCache, SemanticCache
 
 # Paths
 STORAGE_DIR = Path(__file__).parent / "storage"
@@ -32,6 +45,24 @@ EMERGENCY_KEYWORDS = [
     "severe pain", "anaphylaxis", "pancreatitis",
 ]
 
+
+# 소문자 변환은 모듈 로드 시 1회
+_EMERGENCY_KEYWORDS_LOWER = tuple(kw.lower() for kw in EMERGENCY_KEYWORDS)
+
+
+def _build_emergency_automaton() -> Optional["ahocorasick.Automaton"]:
+    """응급 키워드 전체를 Aho-Corasick 오토마톤 하나로 컴파일 (모듈 로드 시 1회)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw_lower, kw in zip(_EMERGENCY_KEYWORDS_LOWER, EMERGENCY_KEYWORDS):
+        automaton.add_word(kw_lower, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+_EMERGENCY_AUTOMATON = _build_emergency_automaton()
+
 # 시스템 프롬프트 - 전문 의료 상담사
 SYSTEM_PROMPT = """당신은 식품의약품안전처 공식 허가 정보를 기반으로 하는
 위고비/마운자로 전문 AI 의약품 상담사입니다.
@@ -78,6 +109,97 @@ EMERGENCY_RESPONSE = """[응급 상황 안내]
 """
 
 
+class CachedEmbedding(BaseEmbedding):
+    """질문 임베딩 캐시 래퍼 (같은 질문은 내부 모델을 다시 돌리지 않음, 문서 임베딩은 그대로 위임)
+
+    batcher를 주면 비동기 질문 임베딩은 동시 요청끼리 모아 배치 forward로 처리
+    (bge-m3는 질문/문서 임베딩에 별도 instruction이 없어 배치 API를 그대로 사용 가능)
+    """
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+    _batcher: Optional[EmbeddingBatcher] = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, cache: EmbeddingCache, batcher: Optional[EmbeddingBatcher] = None, **kwargs):
+        super().__init__(
+            model_name=inner.model_name,
+            embed_batch_size=inner.embed_batch_size,
+            **kwargs,
+        )
+        self._inner = inner
+        self._cache = cache
+        self._batcher = batcher
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        # 모델이 바뀌면 다른 벡터이므로 모델명도 키에 포함
+        cache_text = f"{self.model_name}\0{query}"
+        embedding = self._cache.get(cache_text)
+        if embedding is None:
+            embedding = self._inner._get_query_embedding(query)
+            self._cache.set(cache_text, embedding)
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        if self._batcher is None:
+            # 모델 forward는 블로킹이므로 스레드에서 실행 (aquery 중 이벤트 루프 보호)
+            return await asyncio.to_thread(self._get_query_embedding, query)
+
+        cache_text = f"{self.model_name}\0{query}"
+        embedding = self._cache.get(cache_text)
+        if embedding is None:
+            embedding = await self._batcher.embed(query)
+            self._cache.set(cache_text, embedding)
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._inner._get_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._inner._get_text_embeddings(texts)
+
+
+def _load_embed_model() -> BaseEmbedding:
+    """임베딩 모델 로드 (GPU면 fp16, CPU는 int8 ONNX 폴더가 설정돼 있으면 onnxruntime, 없으면 FP32)"""
+    onnx_dir = Path(settings.RAG_ONNX_EMBED_DIR) if settings.RAG_ONNX_EMBED_DIR else None
+    if torch.cuda.is_available():
+        print("[RAG] Using CUDA fp16 embedding model")
+        inner = HuggingFaceEmbedding(
+            model_name="BAAI/bge-m3",
+            device="cuda",
+            model_kwargs={"torch_dtype": torch.float16},
+        )
+    elif onnx_dir and onnx_dir.exists():
+        from llama_index.embeddings.huggingface_optimum import OptimumEmbedding
+
+        print("[RAG] Using int8 ONNX embedding model")
+        # bge-m3: CLS 풀링 + L2 정규화 (FP32 인덱스와 같은 벡터 공간)
+        inner = OptimumEmbedding(folder_name=str(onnx_dir), pooling="cls", normalize=True)
+    else:
+        inner = HuggingFaceEmbedding(model_name="BAAI/bge-m3", device="cpu")
+    batcher = None
+    if settings.RAG_EMBED_BATCHING:
+        batcher = EmbeddingBatcher(
+            inner._get_text_embeddings,
+            max_batch_size=settings.RAG_EMBED_MAX_BATCH_SIZE,
+            max_batch_hold=settings.RAG_EMBED_MAX_BATCH_HOLD,
+        )
+    return CachedEmbedding(inner, EmbeddingCache(db_path=settings.RAG_CACHE_DB), batcher)
+
+
+def _load_reranker() -> list:
+    """검색 결과 재정렬기 (RAG_RERANK일 때만, 아니면 빈 목록)"""
+    if not settings.RAG_RERANK:
+        return []
+    from llama_index.core.postprocessor import SentenceTransformerRerank
+
+    print(f"[RAG] Using reranker: {settings.RAG_RERANK_MODEL}")
+    return [SentenceTransformerRerank(model=settings.RAG_RERANK_MODEL, top_n=settings.RAG_RERANK_TOP_N)]
+
+
+# 모델 로드 잠금 (Settings.embed_model/llm이 전역이라 인스턴스가 아닌 모듈 단위)
+_INIT_LOCK = threading.Lock()
+
+
 class MedicationRAG:
     """위고비/마운자로 전문 RAG 시스템"""
 
@@ -86,12 +208,31 @@ class MedicationRAG:
         self.index = None
         self.query_engine = None
         self._initialized = False
+        self._cache = ResponseCache(
+            maxsize=settings.RAG_CACHE_SIZE,
+            db_path=settings.RAG_CACHE_DB,
+        )
+        self._semantic_cache = SemanticCache(
+            threshold=settings.RAG_SEMANTIC_CACHE_THRESHOLD,
+            maxsize=settings.RAG_CACHE_SIZE,
+        )
 
     def initialize(self):
-        """인덱스 로드 (lazy initialization)"""
+        """인덱스 로드 (lazy initialization, 동시에 호출돼도 모델/인덱스는 한 번만 로드)"""
         if self._initialized:
             return
 
+        with _INIT_LOCK:
+            if not self._initialized:
+                self._load()
+
+    def warm_up(self):
+        """모델/인덱스를 미리 로드하고 검색을 한 번 실행 (첫 요청의 cold start 제거, LLM 호출 없음)"""
+        self.initialize()
+        self.query_engine.retrieve(QueryBundle("위고비 용법용량"))
+
+    def _load(self):
+        """임베딩 모델/LLM 설정 + 인덱스 로드 (_INIT_LOCK 안에서만 호출)"""
         if not self.storage_dir.exists():
             raise FileNotFoundError(
                 f"Storage not found: {self.storage_dir}\n"
@@ -99,9 +240,7 @@ class MedicationRAG:
             )
 
         print("[RAG] Loading embedding model...")
-        Settings.embed_model = HuggingFaceEmbedding(
-            model_name="BAAI/bge-m3",
-        )
+        Settings.embed_model = _load_embed_model()
 
         print("[RAG] Configuring LLM...")
         Settings.llm = OpenAI(
@@ -116,40 +255,126 @@ class MedicationRAG:
         )
         self.index = load_index_from_storage(storage_context)
 
+        node_postprocessors = _load_reranker()
+        top_k = settings.RAG_RERANK_CANDIDATES if node_postprocessors else SIMILARITY_TOP_K
         self.query_engine = self.index.as_query_engine(
-            similarity_top_k=SIMILARITY_TOP_K,
+            similarity_top_k=top_k,
+            node_postprocessors=node_postprocessors,
+            system_prompt=SYSTEM_PROMPT,
+        )
+        self.stream_engine = self.index.as_query_engine(
+            similarity_top_k=top_k,
+            node_postprocessors=node_postprocessors,
             system_prompt=SYSTEM_PROMPT,
+            streaming=True,
         )
 
         self._initialized = True
         print("[RAG] Ready!")
 
     def _detect_emergency(self, query: str) -> bool:
-        """응급 키워드 감지"""
+        """응급 키워드 감지 (질문을 한 번만 스캔)"""
         query_lower = query.lower()
-        return any(kw in query_lower for kw in EMERGENCY_KEYWORDS)
-
-    def _format_sources(self, response) -> str:
-        """출처 포맷팅"""
-        if not response.source_nodes:
-            return ""
+        if _EMERGENCY_AUTOMATON is not None:
+            return next(_EMERGENCY_AUTOMATON.iter(query_lower), None) is not None
+        for kw in _EMERGENCY_KEYWORDS_LOWER:
+            if kw in query_lower:
+                return True
+        return False
+
+    @staticmethod
+    def _source_label(file_name: str) -> str:
+        """파일명에서 약물명 추출"""
+        if file_name.startswith("wegovy"):
+            return "위고비 허가사항"
+        if file_name.startswith("mounjaro"):
+            return "마운자로 허가사항"
+        return file_name
+
+    def _format_sources(self, response) -> List[str]:
+        """출처 목록 (등장 순서 유지, 중복 제거)"""
+        return list(dict.fromkeys(
+            self._source_label(node.metadata.get("file_name", "알 수 없음"))
+            for node in response.source_nodes
+        ))
+
+    def _build_query(self, query: str, user_context: str, intent: str) -> str:
+        """전체 쿼리 구성 (건강 정보가 있으면 의도 포함)"""
+        if not user_context:
+            return query
+        return f"""## 사용자 건강 정보
+{user_context}
 
-        sources = []
-        seen = set()
+## 의도
+{intent}
 
-        for node in response.source_nodes:
-            source = node.metadata.get("file_name", "알 수 없음")
-            # 파일명에서 약물명 추출
-            if source.startswith("wegovy"):
-                source = "위고비 허가사항"
-            elif source.startswith("mounjaro"):
-                source = "마운자로 허가사항"
+## 질문
+{query}"""
 
-            if source not in seen:
-                seen.add(source)
-                sources.append(source)
+    def _cache_lookup(self, query: str, user_context: str, use_rag: bool, intent: str):
+        """캐시 조회 (같은 질문 → 비슷한 질문 순)
 
-        return ", ".join(sources)
+        Returns:
+            (캐시된 응답 또는 None, 저장용 (cache_key, query_embedding, scope) 또는 None)
+        """
+        cache_key = self._cache.make_key(query, user_context, use_rag, intent)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached, None
+
+        # 표현만 다른 질문은 질문 임베딩 유사도로 조회 (건강 정보가 붙으면 검색어가
+        # 달라져 임베딩을 두 번 계산하게 되고 거의 적중하지도 않으므로 생략)
+        if not self._use_semantic_cache(user_context):
+            return None, (cache_key, None, None)
+        query_embedding = Settings.embed_model.get_query_embedding(query)
+        scope = self._semantic_cache.make_scope(query, user_context, use_rag, intent)
+        return self._semantic_cache.get(query_embedding, scope), (cache_key, query_embedding, scope)
+
+    async def _acache_lookup(self, query: str, user_context: str, use_rag: bool, intent: str):
+        """_cache_lookup의 비동기 버전 (질문 임베딩은 동시 요청과 모아서 배치 계산)"""
+        cache_key = self._cache.make_key(query, user_context, use_rag, intent)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached, None
+
+        if not self._use_semantic_cache(user_context):
+            return None, (cache_key, None, None)
+        query_embedding = await Settings.embed_model.aget_query_embedding(query)
+        scope = self._semantic_cache.make_scope(query, user_context, use_rag, intent)
+        return self._semantic_cache.get(query_embedding, scope), (cache_key, query_embedding, scope)
+
+    @staticmethod
+    def _use_semantic_cache(user_context: str) -> bool:
+        """시맨틱 캐시 사용 여부 (설정으로 켠 경우, 건강 정보가 없는 질문만)"""
+        return settings.RAG_SEMANTIC_CACHE and not user_context
+
+    def _rag_query(self, query: str, full_query: str, cache_entry):
+        """검색 입력 (건강 정보가 없으면 시맨틱 캐시용 질문 임베딩을 검색에 재사용)"""
+        if cache_entry is not None and cache_entry[1] is not None and full_query == query:
+            return QueryBundle(full_query, embedding=cache_entry[1])
+        return full_query
+
+    def _make_result(self, is_emergency: bool, answer: str, response=None, cache_entry=None) -> dict:
+        """응답 dict 구성 (응급 안내 + 답변 + 출처) 후 캐시 저장"""
+        # 출처 수집
+        sources_list = self._format_sources(response) if response is not None else []
+
+        # 응급 안내 / 답변 / 출처 세 부분 고정이라 목록 없이 바로 연결
+        prefix = EMERGENCY_RESPONSE if is_emergency else ""
+        tail = f"\n\n[참고 출처: {', '.join(sources_list)}]" if sources_list else ""
+
+        result = {
+            "response": f"{prefix}{answer}{tail}",
+            "is_emergency": is_emergency,
+            "sources": sources_list,
+        }
+        if cache_entry is not None:
+            cache_key, query_embedding, scope = cache_entry
+            cached = {**result, "sources": list(sources_list)}
+            self._cache.set(cache_key, cached)
+            if query_embedding is not None:
+                self._semantic_cache.set(query_embedding, scope, cached)
+        return result
 
     def ask(
         self,
@@ -172,43 +397,118 @@ class MedicationRAG:
         """
         self.initialize()
 
-        result_parts = []
-        sources_list = []
         is_emergency = self._detect_emergency(query)
 
-        # 응급 상황 체크
-        if is_emergency:
-            result_parts.append(EMERGENCY_RESPONSE)
+        # 응급 상황 응답은 캐시하지 않고 항상 새로 생성
+        cache_entry = None
+        if not is_emergency:
+            cached, cache_entry = self._cache_lookup(query, user_context, use_rag, intent)
+            if cached is not None:
+                return {**cached, "sources": list(cached["sources"])}
 
         # 전체 쿼리 구성 (의도 포함)
-        full_query = query
-        if user_context:
-            full_query = f"""## 사용자 건강 정보
-{user_context}
+        full_query = self._build_query(query, user_context, intent)
 
-## 의도
-{intent}
+        if use_rag:
+            # RAG 사용
+            response = self.query_engine.query(self._rag_query(query, full_query, cache_entry))
+            return self._make_result(is_emergency, str(response), response, cache_entry)
 
-## 질문
-{query}"""
+        # LLM만 사용 (토큰 절약)
+        completion = get_sync_openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": full_query},
+            ],
+            max_tokens=500,
+            temperature=0.3,
+        )
+        return self._make_result(is_emergency, completion.choices[0].message.content, cache_entry=cache_entry)
+
+    async def aask(
+        self,
+        query: str,
+        user_context: str = "",
+        use_rag: bool = True,
+        intent: str = "medication_info",
+    ) -> dict:
+        """
+        질문에 답변 (비동기, 검색/LLM 호출 동안 이벤트 루프를 막지 않음)
+
+        Returns:
+            dict: {response, is_emergency, sources} (ask와 같은 형식)
+        """
+        await asyncio.to_thread(self.initialize)
+
+        is_emergency = self._detect_emergency(query)
+
+        cache_entry = None
+        if not is_emergency:
+            cached, cache_entry = await self._acache_lookup(query, user_context, use_rag, intent)
+            if cached is not None:
+                return {**cached, "sources": list(cached["sources"])}
+
+        full_query = self._build_query(query, user_context, intent)
 
         if use_rag:
-            # RAG 사용
-            response = self.query_engine.query(full_query)
-            result_parts.append(str(response))
-
-            # 출처 수집
-            sources = self._format_sources(response)
-            if sources:
-                sources_list = [s.strip() for s in sources.split(",")]
-                result_parts.append(f"\n\n[참고 출처: {sources}]")
+            response = await self.query_engine.aquery(self._rag_query(query, full_query, cache_entry))
+            return self._make_result(is_emergency, str(response), response, cache_entry)
+
+        # LLM만 사용 (토큰 절약)
+        completion = await get_openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": full_query},
+            ],
+            max_tokens=500,
+            temperature=0.3,
+        )
+        return self._make_result(is_emergency, completion.choices[0].message.content, cache_entry=cache_entry)
+
+    async def astream(
+        self,
+        query: str,
+        user_context: str = "",
+        use_rag: bool = True,
+        intent: str = "medication_info",
+    ) -> AsyncIterator[dict]:
+        """
+        질문에 답변 (토큰 단위 스트리밍, 캐시에 있으면 저장된 응답을 한 번에 전달)
+
+        Yields:
+            dict: {delta} 응답 조각들, 마지막에 {done, is_emergency, sources}
+        """
+        await asyncio.to_thread(self.initialize)
+
+        is_emergency = self._detect_emergency(query)
+
+        cache_entry = None
+        if is_emergency:
+            yield {"delta": EMERGENCY_RESPONSE}
         else:
-            # LLM만 사용 (토큰 절약)
-            from openai import OpenAI as OpenAIClient
+            cached, cache_entry = await self._acache_lookup(query, user_context, use_rag, intent)
+            if cached is not None:
+                yield {"delta": cached["response"]}
+                yield {"done": True, "is_emergency": False, "sources": list(cached["sources"])}
+                return
 
-            client = OpenAIClient(api_key=settings.OPENAI_API_KEY)
+        full_query = self._build_query(query, user_context, intent)
 
-            completion = client.chat.completions.create(
+        tokens = []
+        response = None
+        if use_rag:
+            # 검색 + 첫 토큰까지는 블로킹 호출이므로 스레드에서 실행
+            response = await asyncio.to_thread(
+                self.stream_engine.query, self._rag_query(query, full_query, cache_entry)
+            )
+            token_gen = iter(response.response_gen)
+            while (token := await asyncio.to_thread(next, token_gen, None)) is not None:
+                tokens.append(token)
+                yield {"delta": token}
+        else:
+            stream = await get_openai_client().chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
@@ -216,15 +516,18 @@ class MedicationRAG:
                 ],
                 max_tokens=500,
                 temperature=0.3,
+                stream=True,
             )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    tokens.append(chunk.choices[0].delta.content)
+                    yield {"delta": chunk.choices[0].delta.content}
 
-            result_parts.append(completion.choices[0].message.content)
-
-        return {
-            "response": "".join(result_parts),
-            "is_emergency": is_emergency,
-            "sources": sources_list,
-        }
+        # 전체 응답은 ask와 같은 형식으로 캐시에 저장
+        result = self._make_result(is_emergency, "".join(tokens), response, cache_entry)
+        if result["sources"]:
+            yield {"delta": f"\n\n[참고 출처: {', '.join(result['sources'])}]"}
+        yield {"done": True, "is_emergency": is_emergency, "sources": result["sources"]}
 
     def is_emergency(self, query: str) -> bool:
         """응급 상황 여부 반환"""
@@ -233,13 +536,16 @@ class MedicationRAG:
 
 # 싱글톤 인스턴스
 _rag_instance: Optional[MedicationRAG] = None
+_INSTANCE_LOCK = threading.Lock()
 
 
 def get_rag() -> MedicationRAG:
-    """RAG 인스턴스 가져오기"""
+    """RAG 인스턴스 가져오기 (warm-up 스레드와 요청이 동시에 호출해도 인스턴스는 하나)"""
     global _rag_instance
     if _rag_instance is None:
-        _rag_instance = MedicationRAG()
+        with _INSTANCE_LOCK:
+            if _rag_instance is None:
+                _rag_instance = MedicationRAG()
     return _rag_instance
 
 
@@ -1,25 +1,25 @@
 """
 Standard API response schemas
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Generic, Optional, TypeVar
 from pydantic import BaseModel, Field
 
 T = TypeVar("T")
 
 
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+
 class APIResponse(BaseModel, Generic[T]):
     """Standard API response wrapper"""
     success: bool = True
     data: Optional[T] = None
     error: Optional[str] = None
     message: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
-
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    timestamp: datetime = Field(default_factory=utc_now)
 
 
 class ErrorDetail(BaseModel):
@@ -34,7 +34,7 @@ class ErrorResponse(BaseModel):
     error: str
     error_code: Optional[str] = None
     details: Optional[list[ErrorDetail]] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -45,23 +45,28 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page: int = 1
     page_size: int = 20
     has_more: bool = False
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
 
 
 def success_response(data: Any = None, message: str = None) -> dict:
-    """Helper to create success response"""
-    return APIResponse(
-        success=True,
-        data=data,
-        message=message
-    ).model_dump(mode="json")
+    """Helper to create success response (APIResponse shape, datetime kept for ORJSONResponse)"""
+    return {
+        "success": True,
+        "data": data,
+        "error": None,
+        "message": message,
+        "timestamp": utc_now(),
+    }
 
 
 def error_response(error: str, error_code: str = None, details: list = None) -> dict:
-    """Helper to create error response"""
-    return ErrorResponse(
-        success=False,
-        error=error,
-        error_code=error_code,
-        details=details
-    ).model_dump(mode="json")
+    """Helper to create error response (ErrorResponse shape, datetime kept for ORJSONResponse)"""
+    if details is not None:
+        details = [d.model_dump() if isinstance(d, ErrorDetail) else d for d in details]
+    return {
+        "success": False,
+        "error": error,
+        "error_code": error_code,
+        "details": details,
+        "timestamp": utc_now(),
+    }
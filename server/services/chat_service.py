@@ -2,11 +2,13 @@
 Chat service - Main chatbot logic
 Implements 2-step AI call structure
 """
-from typing import Optional
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Optional
 from supabase import Client
 from openai import AsyncOpenAI
 
-from ai.prompts.classifier import classify_intent, ChatIntent
+from ai.prompts.classifier import classify_intent, match_intent_rules, ChatIntent
 from ai.prompts.builders import (
     UserContext,
     build_log_prompt,
@@ -25,6 +27,7 @@ from ai.tools.food_tools import (
     parse_update_meal_args,
     get_today_local,
 )
+from services.user_cache import invalidate_user_caches, user_context_cache
 from services.user_context import fetch_user_context
 from services.meal_service import (
     log_meal_directly,
@@ -38,6 +41,71 @@ from services.meal_service import (
 # Chat type for diet conversations
 CHAT_TYPE = "diet"
 
+# User context reuse window in seconds (retries and quick follow-ups share one fetch)
+USER_CONTEXT_TTL = 20.0
+
+
+def save_chat_turn(
+    db: Client,
+    user_id: str,
+    chat_type: str,
+    question: str,
+    answer: str,
+    asked_at: datetime,
+) -> None:
+    """
+    Save a question/answer pair to chat_messages in one insert
+
+    Both rows of a single insert would get the same NOW() default, so created_at
+    is set explicitly (question: when it was received, answer: now) to keep the order.
+    """
+    db.table("chat_messages").insert([
+        {
+            "user_id": user_id,
+            "role": "user",
+            "content": question,
+            "chat_type": chat_type,
+            "created_at": asked_at.isoformat(),
+        },
+        {
+            "user_id": user_id,
+            "role": "assistant",
+            "content": answer,
+            "chat_type": chat_type,
+            "created_at": max(datetime.now(timezone.utc), asked_at + timedelta(milliseconds=1)).isoformat(),
+        },
+    ]).execute()
+
+
+def save_user_message(
+    db: Client,
+    user_id: str,
+    chat_type: str,
+    question: str,
+    asked_at: datetime,
+) -> None:
+    """Save only the question to chat_messages (when no answer could be generated)"""
+    try:
+        db.table("chat_messages").insert({
+            "user_id": user_id,
+            "role": "user",
+            "content": question,
+            "chat_type": chat_type,
+            "created_at": asked_at.isoformat(),
+        }).execute()
+    except Exception as e:
+        print(f"[Chat] Failed to save user message: {e}")
+
+
+# Prompt builders per intent (other intents use the context-free chat prompt)
+_INTENT_PROMPT_BUILDERS: dict[str, Callable[[CoachPersona, UserContext], str]] = {
+    "log": build_log_prompt,
+    "query": build_query_prompt,
+    "stats": build_stats_prompt,
+    "modify": build_modify_prompt,
+    "analyze": build_analyze_prompt,
+}
+
 
 def build_prompt_for_intent(
     intent: ChatIntent,
@@ -45,29 +113,124 @@ def build_prompt_for_intent(
     context: UserContext,
 ) -> str:
     """Build the appropriate prompt based on intent"""
-    if intent == "log":
-        return build_log_prompt(persona, context)
-    elif intent == "query":
-        return build_query_prompt(persona, context)
-    elif intent == "stats":
-        return build_stats_prompt(persona, context)
-    elif intent == "modify":
-        return build_modify_prompt(persona, context)
-    elif intent == "analyze":
-        return build_analyze_prompt(persona, context)
-    else:
+    builder = _INTENT_PROMPT_BUILDERS.get(intent)
+    if builder is None:
         return build_chat_prompt(persona)
+    return builder(persona, context)
 
 
-async def process_message(
+# Argument parser per tool (parsers return None for unusable arguments)
+_TOOL_ARG_PARSERS: dict[str, Callable[[str], Optional[dict]]] = {
+    "log_meal": parse_log_meal_args,
+    "get_meals": parse_get_meals_args,
+    "delete_meal": parse_delete_meal_args,
+    "update_meal": parse_update_meal_args,
+}
+
+# Tools that change meal data
+_MEAL_WRITE_TOOLS = frozenset({"log_meal", "delete_meal", "update_meal"})
+
+
+def _parse_tool_args(func_name: str, func_args: str) -> Optional[dict]:
+    """Parse function call arguments (None for unknown tools or invalid arguments)"""
+    parser = _TOOL_ARG_PARSERS.get(func_name)
+    return parser(func_args) if parser else None
+
+
+def _group_tool_calls(parsed_calls: list[tuple[int, str, Optional[dict]]]) -> list[list[int]]:
+    """
+    Group tool calls that touch the same meal, keeping their order
+
+    Calls on different meals can run concurrently; calls on the same
+    date/meal type (or on a whole day, get_meals "all") run in order.
+    """
+    targets = {}
+    for i, func_name, args in parsed_calls:
+        if args is None:
+            targets[i] = None
+            continue
+        meal_type = args.get("meal_type") or ("all" if func_name == "get_meals" else infer_meal_type())
+        targets[i] = (args.get("date") or get_today_local(), meal_type)
+
+    whole_days = {target[0] for target in targets.values() if target and target[1] == "all"}
+
+    groups: dict = {}
+    for i, target in targets.items():
+        if target is None:
+            key = ("no-op", i)
+        elif target[0] in whole_days:
+            key = target[0]
+        else:
+            key = target
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+
+def _discard_task(task: asyncio.Task) -> None:
+    """Cancel a task whose result isn't needed, without surfacing its error"""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def _execute_tool_call(db: Client, user_id: str, func_name: str, args: Optional[dict]) -> str:
+    """Run one parsed function call from the model and return its result message"""
+    print(f"[Chat] Function call: {func_name}")
+
+    if args is None:
+        return ""
+
+    if func_name == "log_meal":
+        res = await log_meal_directly(
+            db,
+            user_id,
+            args.get("meal_type") or infer_meal_type(),
+            args.get("date") or get_today_local(),
+            args["foods"],
+        )
+        return res["message"]
+
+    elif func_name == "get_meals":
+        res = await get_meals_data(
+            db,
+            user_id,
+            args.get("date") or get_today_local(),
+            args.get("meal_type") or "all",
+        )
+        return res["message"]
+
+    elif func_name == "delete_meal":
+        res = await delete_meal_data(
+            db,
+            user_id,
+            args["date"],
+            args["meal_type"],
+            args.get("food_name"),
+        )
+        return res["message"]
+
+    elif func_name == "update_meal":
+        res = await update_meal_data(
+            db,
+            user_id,
+            args["date"],
+            args["meal_type"],
+            args["old_food_name"],
+            args["new_food"],
+        )
+        return res["message"]
+
+    return ""
+
+
+async def stream_message(
     openai_client: AsyncOpenAI,
     db: Client,
     user_id: str,
     content: str,
     persona: CoachPersona,
-) -> dict:
+) -> AsyncIterator[dict]:
     """
-    Process a chat message through the 2-step AI pipeline
+    Process a chat message through the 2-step AI pipeline, streaming the reply
 
     Args:
         openai_client: OpenAI client
@@ -76,192 +239,225 @@ async def process_message(
         content: User message content
         persona: Coach persona
 
-    Returns:
-        Dict with message, intent, and optional action_result
+    Yields:
+        {"delta": str} reply chunks, then {"done": True, "intent": ..., "action_result": ...}
     """
-    # 1. Save user message
-    db.table("chat_messages").insert({
-        "user_id": user_id,
-        "role": "user",
-        "content": content,
-        "chat_type": CHAT_TYPE,
-    }).execute()
-
-    # 2. Step 1: Classify intent
-    intent = await classify_intent(openai_client, content)
-    print(f"[Chat] Intent classified: {intent}")
-
-    # 3. Fetch user context (except for chat)
-    if intent != "chat":
-        user_context = await fetch_user_context(db, user_id)
-    else:
-        user_context = UserContext(today=get_today_local())
-
-    # 4. Build prompt and get tools
-    system_prompt = build_prompt_for_intent(intent, persona, user_context)
-    tools = get_tools_for_intent(intent)
-
-    # 5. Call OpenAI
-    completion_params = {
-        "model": "gpt-4o-mini",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": content},
-        ],
-        "max_tokens": 150 if intent == "chat" else 500,
-        "temperature": 0.7,
-    }
+    # 1. Received time of the user message (saved together with the reply at the end,
+    # or alone if the reply fails)
+    asked_at = datetime.now(timezone.utc)
+    save_task = None
+
+    try:
+        # 2-3. Step 1: Classify intent while fetching user context
+        # (most intents need the context, so unless the local rules already say
+        # "chat" it is fetched alongside the classifier round trip; the context is
+        # reused for a short while so retries and quick follow-ups skip the queries)
+        user_context = user_context_cache.get(user_id, "user_context", USER_CONTEXT_TTL)
+        context_task = None
+        if user_context is None and match_intent_rules(content) != "chat":
+            context_task = asyncio.create_task(fetch_user_context(db, user_id))
+
+        try:
+            intent = await classify_intent(openai_client, content)
+        except BaseException:
+            if context_task is not None:
+                _discard_task(context_task)
+            raise
+        print(f"[Chat] Intent classified: {intent}")
+
+        if intent == "chat":
+            if context_task is not None:
+                # Context isn't used for chat (queries already sent still finish)
+                _discard_task(context_task)
+            user_context = UserContext(today=get_today_local())
+        elif context_task is not None:
+            user_context = await context_task
+            user_context_cache.set(user_id, "user_context", user_context)
+
+        # 4. Build prompt and get tools
+        system_prompt = build_prompt_for_intent(intent, persona, user_context)
+        tools = get_tools_for_intent(intent)
+
+        # 5. Call OpenAI (streamed; tool call arguments arrive in pieces keyed by index)
+        completion_params = {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content},
+            ],
+            "max_tokens": 150 if intent == "chat" else 500,
+            "temperature": 0.7,
+            "stream": True,
+        }
 
-    if tools:
-        completion_params["tools"] = tools
-        if intent == "query":
-            completion_params["tool_choice"] = {
-                "type": "function",
-                "function": {"name": "get_meals"},
-            }
-        else:
-            completion_params["tool_choice"] = "auto"
-
-    response = await openai_client.chat.completions.create(**completion_params)
-    response_message = response.choices[0].message
-    assistant_content = response_message.content or ""
-
-    # 6. Process Function Calling
-    action_result = None
-    if response_message.tool_calls:
-        tool_results_with_ids = []
-        processed_calls = set()
-
-        for tool_call in response_message.tool_calls:
-            func_name = tool_call.function.name
-            func_args = tool_call.function.arguments
-
-            # Prevent duplicate calls
-            call_key = f"{func_name}:{func_args}"
-            if call_key in processed_calls:
-                tool_results_with_ids.append({
-                    "id": tool_call.id,
-                    "result": "(중복 호출 - 스킵됨)",
-                })
-                continue
-            processed_calls.add(call_key)
-
-            result = ""
-            print(f"[Chat] Function call: {func_name}")
-
-            if func_name == "log_meal":
-                args = parse_log_meal_args(func_args)
-                if args:
-                    res = await log_meal_directly(
-                        db,
-                        user_id,
-                        args.get("meal_type") or infer_meal_type(),
-                        args.get("date") or get_today_local(),
-                        args["foods"],
-                    )
-                    result = res["message"]
-
-            elif func_name == "get_meals":
-                args = parse_get_meals_args(func_args)
-                res = await get_meals_data(
-                    db,
-                    user_id,
-                    args.get("date") or get_today_local(),
-                    args.get("meal_type") or "all",
-                )
-                result = res["message"]
-
-            elif func_name == "delete_meal":
-                args = parse_delete_meal_args(func_args)
-                if args:
-                    res = await delete_meal_data(
-                        db,
-                        user_id,
-                        args["date"],
-                        args["meal_type"],
-                        args.get("food_name"),
-                    )
-                    result = res["message"]
-
-            elif func_name == "update_meal":
-                args = parse_update_meal_args(func_args)
-                if args:
-                    res = await update_meal_data(
-                        db,
-                        user_id,
-                        args["date"],
-                        args["meal_type"],
-                        args["old_food_name"],
-                        args["new_food"],
-                    )
-                    result = res["message"]
-
-            tool_results_with_ids.append({
-                "id": tool_call.id,
-                "result": result or "completed",
-            })
-
-        # Generate follow-up response with tool results
-        if tool_results_with_ids and not assistant_content:
-            tool_messages = [
-                {
-                    "role": "tool",
-                    "tool_call_id": tr["id"],
-                    "content": tr["result"],
+        if tools:
+            completion_params["tools"] = tools
+            if intent == "query":
+                completion_params["tool_choice"] = {
+                    "type": "function",
+                    "function": {"name": "get_meals"},
                 }
-                for tr in tool_results_with_ids
-            ]
-
-            follow_up_response = await openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": content},
-                    {
-                        "role": "assistant",
-                        "content": None,
-                        "tool_calls": [
-                            {
-                                "id": tc.id,
-                                "type": "function",
-                                "function": {
-                                    "name": tc.function.name,
-                                    "arguments": tc.function.arguments,
-                                },
-                            }
-                            for tc in response_message.tool_calls
-                        ],
-                    },
-                    *tool_messages,
-                ],
-                max_tokens=300,
-                temperature=0.7,
-            )
-
-            assistant_content = follow_up_response.choices[0].message.content or ""
+            else:
+                completion_params["tool_choice"] = "auto"
+
+        content_parts = []
+        tool_calls: dict[int, dict] = {}
+        async for chunk in await openai_client.chat.completions.create(**completion_params):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content_parts.append(delta.content)
+                yield {"delta": delta.content}
+            for tc in delta.tool_calls or []:
+                call = tool_calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function:
+                    call["name"] += tc.function.name or ""
+                    call["arguments"] += tc.function.arguments or ""
+        assistant_content = "".join(content_parts)
+
+        # 6. Process Function Calling
+        action_result = None
+        if tool_calls:
+            calls = [tool_calls[i] for i in sorted(tool_calls)]
+            results: dict[int, str] = {}
+            parsed_calls = []
+            processed_calls = set()
+
+            for i, call in enumerate(calls):
+                # Prevent duplicate calls
+                call_key = (call["name"], call["arguments"])
+                if call_key in processed_calls:
+                    results[i] = "(중복 호출 - 스킵됨)"
+                    continue
+                processed_calls.add(call_key)
+                parsed_calls.append((i, call["name"], _parse_tool_args(call["name"], call["arguments"])))
+
+            # Calls on different meals run concurrently, calls on the same meal in order
+            parsed_by_index = {i: (func_name, args) for i, func_name, args in parsed_calls}
+
+            async def run_group(indices: list[int]) -> None:
+                for i in indices:
+                    func_name, args = parsed_by_index[i]
+                    results[i] = await _execute_tool_call(db, user_id, func_name, args) or "completed"
+
+            # A failing group doesn't abandon the others mid-write; each call reports its own outcome
+            groups = _group_tool_calls(parsed_calls)
+            outcomes = await asyncio.gather(*(run_group(group) for group in groups), return_exceptions=True)
+            for group, outcome in zip(groups, outcomes):
+                if isinstance(outcome, BaseException):
+                    print(f"[Chat] Tool call failed: {outcome}")
+                    for i in group:
+                        results.setdefault(i, "(오류 - 처리되지 않음)")
+
+            # Meal writes change the health context and summaries (today's calories)
+            if any(func_name in _MEAL_WRITE_TOOLS for _, func_name, _ in parsed_calls):
+                invalidate_user_caches(user_id)
+
+            # Result text per call, in call order
+            tool_results = [results[i] for i in range(len(calls))]
+
+            # Generate follow-up response with tool results
             if not assistant_content:
-                assistant_content = "\n".join(tr["result"] for tr in tool_results_with_ids)
+                tool_messages = [
+                    {
+                        "role": "tool",
+                        "tool_call_id": call["id"],
+                        "content": result,
+                    }
+                    for call, result in zip(calls, tool_results)
+                ]
+
+                follow_up_stream = await openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": content},
+                        {
+                            "role": "assistant",
+                            "content": None,
+                            "tool_calls": [
+                                {
+                                    "id": call["id"],
+                                    "type": "function",
+                                    "function": {
+                                        "name": call["name"],
+                                        "arguments": call["arguments"],
+                                    },
+                                }
+                                for call in calls
+                            ],
+                        },
+                        *tool_messages,
+                    ],
+                    max_tokens=300,
+                    temperature=0.7,
+                    stream=True,
+                )
+
+                async for chunk in follow_up_stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content_parts.append(chunk.choices[0].delta.content)
+                        yield {"delta": chunk.choices[0].delta.content}
+                assistant_content = "".join(content_parts)
+
+                if not assistant_content:
+                    assistant_content = "\n".join(tool_results)
+                    yield {"delta": assistant_content}
+
+            action_result = {
+                "tool_calls": tool_results,
+            }
+
+        # 7. Fallback
+        if not assistant_content:
+            assistant_content = "응답을 생성할 수 없습니다."
+            yield {"delta": assistant_content}
+
+        # 8. Save user + assistant messages (shielded: a disconnect mid-insert
+        # doesn't leave it unclear whether the turn was written)
+        save_task = asyncio.ensure_future(asyncio.to_thread(
+            save_chat_turn, db, user_id, CHAT_TYPE, content, assistant_content, asked_at
+        ))
+        await asyncio.shield(save_task)
+    except BaseException:
+        # Keep the question in history when the reply or its save fails, or the
+        # client goes away (a save still running in its thread will write the turn)
+        if save_task is None or (save_task.done() and (save_task.cancelled() or save_task.exception())):
+            await asyncio.shield(asyncio.to_thread(
+                save_user_message, db, user_id, CHAT_TYPE, content, asked_at
+            ))
+        raise
+
+    yield {"done": True, "intent": intent, "action_result": action_result}
 
-        action_result = {
-            "tool_calls": [tr["result"] for tr in tool_results_with_ids],
-        }
 
-    # 7. Fallback
-    if not assistant_content:
-        assistant_content = "응답을 생성할 수 없습니다."
+async def process_message(
+    openai_client: AsyncOpenAI,
+    db: Client,
+    user_id: str,
+    content: str,
+    persona: CoachPersona,
+) -> dict:
+    """
+    Process a chat message and return the whole reply at once
 
-    # 8. Save assistant message
-    db.table("chat_messages").insert({
-        "user_id": user_id,
-        "role": "assistant",
-        "content": assistant_content,
-        "chat_type": CHAT_TYPE,
-    }).execute()
+    Returns:
+        Dict with message, intent, and optional action_result
+    """
+    deltas = []
+    async for event in stream_message(openai_client, db, user_id, content, persona):
+        if "delta" in event:
+            deltas.append(event["delta"])
+        else:
+            done = event
 
     return {
-        "message": assistant_content,
-        "intent": intent,
-        "action_result": action_result,
+        "message": "".join(deltas),
+        "intent": done["intent"],
+        "action_result": done["action_result"],
     }
 
 
@@ -271,19 +467,28 @@ async def get_chat_history(
     limit: int = 50,
 ) -> list[dict]:
     """Get chat history for a user"""
-    result = db.table("chat_messages").select("*").eq(
-        "user_id", user_id
-    ).eq("chat_type", CHAT_TYPE).order(
-        "created_at", desc=True
-    ).limit(limit).execute()
-
+    # Only the fields of the frontend ChatMessage type
+    result = await asyncio.to_thread(
+        db.table("chat_messages").select(
+            "id, user_id, role, content, chat_type, created_at"
+        ).eq(
+            "user_id", user_id
+        ).eq("chat_type", CHAT_TYPE).order(
+            "created_at", desc=True
+        ).limit(limit).execute
+    )
+
+    # Latest N come back newest first; flip them in place to chronological order
     messages = result.data or []
-    return list(reversed(messages))
+    messages.reverse()
+    return messages
 
 
 async def clear_chat_history(db: Client, user_id: str) -> bool:
     """Clear chat history for a user"""
-    db.table("chat_messages").delete().eq(
-        "user_id", user_id
-    ).eq("chat_type", CHAT_TYPE).execute()
+    await asyncio.to_thread(
+        db.table("chat_messages").delete().eq(
+            "user_id", user_id
+        ).eq("chat_type", CHAT_TYPE).execute
+    )
     return True
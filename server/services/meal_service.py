@@ -1,6 +1,8 @@
 """
 Meal service - CRUD operations for meals
 """
+import asyncio
+import time
 from typing import Optional, Literal
 from datetime import date, timedelta
 from supabase import Client
@@ -15,23 +17,19 @@ MEAL_TYPE_LABELS = {
 }
 
 
+# Meal type by hour of day (breakfast 5-10, lunch 10-15, dinner 15-21, otherwise snack)
+HOUR_TO_MEAL_TYPE: tuple[MealType, ...] = (
+    ("snack",) * 5 + ("breakfast",) * 5 + ("lunch",) * 5 + ("dinner",) * 6 + ("snack",) * 3
+)
+
+
 def get_today() -> str:
     return date.today().isoformat()
 
 
 def infer_meal_type() -> MealType:
     """Infer meal type from current time"""
-    from datetime import datetime
-    hour = datetime.now().hour
-
-    if 5 <= hour < 10:
-        return "breakfast"
-    elif 10 <= hour < 15:
-        return "lunch"
-    elif 15 <= hour < 21:
-        return "dinner"
-    else:
-        return "snack"
+    return HOUR_TO_MEAL_TYPE[time.localtime().tm_hour]
 
 
 async def log_meal_directly(
@@ -54,101 +52,55 @@ async def log_meal_directly(
     Returns:
         Result dict with success status and message
     """
-    # Process foods
-    processed_foods = [
-        {
+    # Process foods (scale by quantity once per food)
+    processed_foods = []
+    for f in foods:
+        quantity = f.get("quantity", 1)
+        processed_foods.append({
             "name": f["name"],
-            "quantity": f.get("quantity", 1),
-            "calories": round(f["calories"] * f.get("quantity", 1)),
-            "protein": round(f["protein"] * f.get("quantity", 1) * 10) / 10,
-            "carbs": round(f["carbs"] * f.get("quantity", 1) * 10) / 10,
-            "fat": round(f["fat"] * f.get("quantity", 1) * 10) / 10,
-        }
-        for f in foods
-    ]
-
-    new_items_calories = sum(f["calories"] for f in processed_foods)
-
-    # Check for existing meal
-    try:
-        existing_result = db.table("meals").select(
-            "id, total_calories"
-        ).eq("user_id", user_id).eq("date", meal_date).eq("meal_type", meal_type).maybe_single().execute()
-        existing_meal = existing_result.data if existing_result else None
-    except Exception:
-        existing_meal = None
-
-    if existing_meal:
-        meal_id = existing_meal["id"]
-
-        # Check for duplicate foods
-        existing_items_result = db.table("meal_items").select("name").eq("meal_id", meal_id).execute()
-        existing_names = {item["name"].lower() for item in (existing_items_result.data or [])}
-
-        # Filter out duplicates
-        new_foods = [f for f in processed_foods if f["name"].lower() not in existing_names]
-
-        if not new_foods:
-            food_names = ", ".join(f["name"] for f in processed_foods)
-            return {"success": True, "message": f"{food_names}은(는) 이미 기록되어 있어요!"}
-
-        new_calories = sum(f["calories"] for f in new_foods)
-        total_calories = (existing_meal.get("total_calories") or 0) + new_calories
-
-        # Insert new items
-        meal_items = [
-            {
-                "meal_id": meal_id,
-                "name": f["name"],
-                "calories": f["calories"],
-                "protein_g": f["protein"],
-                "carbs_g": f["carbs"],
-                "fat_g": f["fat"],
-                "quantity": f"{f['quantity']}인분",
-            }
-            for f in new_foods
-        ]
-
-        db.table("meal_items").insert(meal_items).execute()
-        db.table("meals").update({"total_calories": total_calories}).eq("id", meal_id).execute()
-
-        food_names = ", ".join(f["name"] for f in new_foods)
-        return {"success": True, "message": f"{food_names} ({new_calories}kcal) 기록 완료"}
-
-    else:
-        # Create new meal
-        total_calories = new_items_calories
-
-        # Insert and get the ID back
-        meal_insert = db.table("meals").insert({
-            "user_id": user_id,
-            "date": meal_date,
-            "meal_type": meal_type,
-            "total_calories": total_calories,
-        }).execute()
-
-        if not meal_insert.data:
-            return {"success": False, "message": "식사 기록 실패"}
-
-        meal_id = meal_insert.data[0]["id"]
-
-        meal_items = [
-            {
-                "meal_id": meal_id,
-                "name": f["name"],
-                "calories": f["calories"],
-                "protein_g": f["protein"],
-                "carbs_g": f["carbs"],
-                "fat_g": f["fat"],
-                "quantity": f"{f['quantity']}인분",
-            }
-            for f in processed_foods
-        ]
-
-        db.table("meal_items").insert(meal_items).execute()
-
+            "quantity": quantity,
+            "calories": round(f["calories"] * quantity),
+            "protein": round(f["protein"] * quantity * 10) / 10,
+            "carbs": round(f["carbs"] * quantity * 10) / 10,
+            "fat": round(f["fat"] * quantity * 10) / 10,
+        })
+
+    # Find or create the meal, skip foods already in it and update the total
+    # in one transaction (log_meal RPC, supabase/migrations/20241211_log_meal.sql)
+    result = await asyncio.to_thread(
+        db.rpc("log_meal", {
+            "p_user_id": user_id,
+            "p_date": meal_date,
+            "p_meal_type": meal_type,
+            "p_items": [
+                {
+                    "name": f["name"],
+                    "calories": f["calories"],
+                    "protein_g": f["protein"],
+                    "carbs_g": f["carbs"],
+                    "fat_g": f["fat"],
+                    "quantity": f"{f['quantity']}인분",
+                }
+                for f in processed_foods
+            ],
+        }).execute
+    )
+
+    logged = result.data
+    if not logged:
+        return {"success": False, "message": "식사 기록 실패"}
+
+    # Foods the function inserted (same name check as in SQL)
+    existing_names = set(logged.get("existing_names") or [])
+    new_foods = [f for f in processed_foods if f["name"].lower() not in existing_names]
+
+    if not new_foods:
         food_names = ", ".join(f["name"] for f in processed_foods)
-        return {"success": True, "message": f"{food_names} ({total_calories}kcal) 기록 완료"}
+        return {"success": True, "message": f"{food_names}은(는) 이미 기록되어 있어요!"}
+
+    new_calories = sum(f["calories"] for f in new_foods)
+    food_names = ", ".join(f["name"] for f in new_foods)
+    return {"success": True, "message": f"{food_names} ({new_calories}kcal) 기록 완료"}
 
 
 async def get_meals_data(
@@ -163,21 +115,23 @@ async def get_meals_data(
     if meal_type != "all":
         query = query.eq("meal_type", meal_type)
 
-    result = query.order("created_at", desc=False).execute()
+    result = await asyncio.to_thread(query.order("created_at", desc=False).execute)
     meals = result.data or []
 
     if not meals:
         return {"success": True, "message": f"{meal_date} 식단 기록이 없습니다.", "data": None}
 
     summary_lines = []
+    total_calories = 0
     for m in meals:
         items = m.get("meal_items", []) or []
         item_names = ", ".join(item.get("name", "") for item in items)
         label = MEAL_TYPE_LABELS.get(m.get("meal_type"), "")
-        summary_lines.append(f"{label}: {item_names} ({m.get('total_calories', 0)}kcal)")
+        meal_calories = m.get("total_calories", 0)
+        summary_lines.append(f"{label}: {item_names} ({meal_calories}kcal)")
+        total_calories += meal_calories or 0
 
     summary = "\n".join(summary_lines)
-    total_calories = sum(m.get("total_calories", 0) or 0 for m in meals)
 
     return {
         "success": True,
@@ -194,9 +148,11 @@ async def delete_meal_data(
     food_name: Optional[str] = None,
 ) -> dict:
     """Delete meal or specific food item"""
-    meal_result = db.table("meals").select(
-        "id, total_calories, meal_items (id, name, calories)"
-    ).eq("user_id", user_id).eq("date", meal_date).eq("meal_type", meal_type).maybe_single().execute()
+    meal_result = await asyncio.to_thread(
+        db.table("meals").select(
+            "id, total_calories, meal_items (id, name, calories)"
+        ).eq("user_id", user_id).eq("date", meal_date).eq("meal_type", meal_type).maybe_single().execute
+    )
 
     meal = meal_result.data
     if not meal:
@@ -205,28 +161,31 @@ async def delete_meal_data(
     if food_name:
         # Delete specific item
         items = meal.get("meal_items", []) or []
-        target_item = None
-        for item in items:
-            if food_name.lower() in item.get("name", "").lower():
-                target_item = item
-                break
+        # Case-insensitive substring match (the search name is folded once)
+        search_name = food_name.casefold()
+        target_item = next(
+            (item for item in items if search_name in item.get("name", "").casefold()),
+            None,
+        )
 
         if not target_item:
             return {"success": False, "message": f'"{food_name}"을(를) 찾을 수 없습니다.'}
 
-        db.table("meal_items").delete().eq("id", target_item["id"]).execute()
+        await asyncio.to_thread(db.table("meal_items").delete().eq("id", target_item["id"]).execute)
 
         new_total = max(0, (meal.get("total_calories") or 0) - target_item.get("calories", 0))
-        db.table("meals").update({"total_calories": new_total}).eq("id", meal["id"]).execute()
+        await asyncio.to_thread(
+            db.table("meals").update({"total_calories": new_total}).eq("id", meal["id"]).execute
+        )
 
         # If last item, delete the meal
         if len(items) == 1:
-            db.table("meals").delete().eq("id", meal["id"]).execute()
+            await asyncio.to_thread(db.table("meals").delete().eq("id", meal["id"]).execute)
 
         return {"success": True, "message": f'"{target_item["name"]}" 삭제 완료'}
 
     # Delete entire meal
-    db.table("meals").delete().eq("id", meal["id"]).execute()
+    await asyncio.to_thread(db.table("meals").delete().eq("id", meal["id"]).execute)
     return {"success": True, "message": f"{MEAL_TYPE_LABELS[meal_type]} 전체 삭제 완료"}
 
 
@@ -239,36 +198,29 @@ async def update_meal_data(
     new_food: dict,
 ) -> dict:
     """Update a food item in a meal"""
-    meal_result = db.table("meals").select(
-        "id, total_calories, meal_items (id, name, calories)"
-    ).eq("user_id", user_id).eq("date", meal_date).eq("meal_type", meal_type).maybe_single().execute()
-
-    meal = meal_result.data
-    if not meal:
+    # Find the item, replace it and adjust the meal total in one transaction
+    # (update_meal_item RPC, supabase/migrations/20241212_update_meal_item.sql)
+    result = await asyncio.to_thread(
+        db.rpc("update_meal_item", {
+            "p_user_id": user_id,
+            "p_date": meal_date,
+            "p_meal_type": meal_type,
+            "p_old_name": old_food_name,
+            "p_new_item": {
+                "name": new_food["name"],
+                "calories": new_food["calories"],
+                "protein_g": new_food["protein"],
+                "carbs_g": new_food["carbs"],
+                "fat_g": new_food["fat"],
+            },
+        }).execute
+    )
+
+    updated = result.data or {}
+    status = updated.get("status")
+    if status == "no_meal":
         return {"success": False, "message": f"{meal_date} {MEAL_TYPE_LABELS[meal_type]} 기록이 없습니다."}
-
-    items = meal.get("meal_items", []) or []
-    target_item = None
-    for item in items:
-        if old_food_name.lower() in item.get("name", "").lower():
-            target_item = item
-            break
-
-    if not target_item:
+    if status != "updated":
         return {"success": False, "message": f'"{old_food_name}"을(를) 찾을 수 없습니다.'}
 
-    # Update the item
-    db.table("meal_items").update({
-        "name": new_food["name"],
-        "calories": new_food["calories"],
-        "protein_g": new_food["protein"],
-        "carbs_g": new_food["carbs"],
-        "fat_g": new_food["fat"],
-    }).eq("id", target_item["id"]).execute()
-
-    # Update meal total
-    calories_diff = new_food["calories"] - target_item.get("calories", 0)
-    new_total = max(0, (meal.get("total_calories") or 0) + calories_diff)
-    db.table("meals").update({"total_calories": new_total}).eq("id", meal["id"]).execute()
-
-    return {"success": True, "message": f'"{target_item["name"]}" → "{new_food["name"]}" 수정 완료'}
+    return {"success": True, "message": f'"{updated["old_name"]}" → "{new_food["name"]}" 수정 완료'}
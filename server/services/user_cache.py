@@ -0,0 +1,71 @@
+"""
+Per-user TTL caches - reuse derived user data across back-to-back requests
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class UserCache:
+    """
+    In-process TTL cache grouped by user (LRU over users and over each user's keys)
+
+    Entries of one user can be dropped together when their data changes.
+    Keys built from request parameters or dates are bounded per user, so stale
+    or client-varied keys can't pile up.
+    """
+
+    def __init__(self, max_users: int = 10000, max_entries_per_user: int = 32):
+        self._max_users = max_users
+        self._max_entries_per_user = max_entries_per_user
+        self._users: "OrderedDict[str, OrderedDict[Hashable, tuple[float, Any]]]" = OrderedDict()
+
+    def get(self, user_id: str, key: Hashable, ttl: float) -> Optional[Any]:
+        """Get a cached value if it is younger than ttl seconds"""
+        entries = self._users.get(user_id)
+        if entries is None or key not in entries:
+            return None
+        cached_at, value = entries[key]
+        if time.monotonic() - cached_at >= ttl:
+            del entries[key]
+            return None
+        entries.move_to_end(key)
+        self._users.move_to_end(user_id)
+        return value
+
+    def set(self, user_id: str, key: Hashable, value: Any) -> None:
+        """Store a value (evicts the least recently used key/user when full)"""
+        entries = self._users.setdefault(user_id, OrderedDict())
+        entries[key] = (time.monotonic(), value)
+        entries.move_to_end(key)
+        if len(entries) > self._max_entries_per_user:
+            entries.popitem(last=False)
+        self._users.move_to_end(user_id)
+        if len(self._users) > self._max_users:
+            self._users.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop all cached values of a user"""
+        self._users.pop(user_id, None)
+
+
+# Medication chat health context (api/v1/medication.py)
+health_context_cache = UserCache()
+
+# Summary endpoint responses (api/v1/summary.py)
+summary_cache = UserCache()
+
+# Diet chat user context (services/chat_service.py)
+user_context_cache = UserCache()
+
+
+def invalidate_user_caches(user_id: str) -> None:
+    """
+    Drop a user's cached data after a write made through the server
+
+    Writes the web client makes directly to Supabase are not seen here;
+    those go stale for at most each cache's TTL.
+    """
+    health_context_cache.invalidate(user_id)
+    summary_cache.invalidate(user_id)
+    user_context_cache.invalidate(user_id)
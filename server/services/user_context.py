@@ -1,6 +1,8 @@
 """
 User context service - fetches user data for AI prompts
 """
+import asyncio
+from itertools import groupby
 from datetime import date, timedelta
 from typing import Optional
 from supabase import Client
@@ -32,12 +34,44 @@ async def fetch_user_context(db: Client, user_id: str) -> UserContext:
     today = get_today()
     seven_days_ago = date.today() - timedelta(days=6)
     week_ago_str = format_date(seven_days_ago)
+    # The consecutive-days check looks back up to 7 days before today
+    streak_start_str = format_date(date.today() - timedelta(days=7))
+
+    # The supabase client is sync, so run the independent queries in worker threads concurrently
+    (
+        today_meals_result,
+        profile_result,
+        weight_logs_result,
+        weekly_meals_result,
+    ) = await asyncio.gather(
+        asyncio.to_thread(
+            db.table("meals").select(
+                "total_calories, meal_type, meal_items (name)"
+            ).eq("user_id", user_id).eq("date", today).execute
+        ),
+        asyncio.to_thread(
+            db.table("user_profiles").select(
+                "target_calories, current_weight_kg, goal_weight_kg"
+            ).eq("user_id", user_id).maybe_single().execute
+        ),
+        asyncio.to_thread(
+            db.table("progress_logs").select(
+                "date, weight_kg"
+            ).eq("user_id", user_id).gte("date", week_ago_str).lte("date", today).order(
+                "date", desc=False
+            ).execute
+        ),
+        # Meals of the consecutive-days window, which is one day longer than the week
+        asyncio.to_thread(
+            db.table("meals").select(
+                "date, total_calories"
+            ).eq("user_id", user_id).gte("date", streak_start_str).lte("date", today).order(
+                "date", desc=False
+            ).execute
+        ),
+    )
 
     # 1. Today's meals
-    today_meals_result = db.table("meals").select(
-        "total_calories, meal_type, meal_items (name)"
-    ).eq("user_id", user_id).eq("date", today).execute()
-
     today_meals = today_meals_result.data or []
     today_calories = sum(meal.get("total_calories", 0) or 0 for meal in today_meals)
 
@@ -48,28 +82,18 @@ async def fetch_user_context(db: Client, user_id: str) -> UserContext:
         "dinner": "저녁",
         "snack": "간식",
     }
-    today_foods = []
-    for meal in today_meals:
-        meal_items = meal.get("meal_items", []) or []
-        for item in meal_items:
-            today_foods.append(f"{meal_type_kr.get(meal.get('meal_type'), '')}:{item.get('name', '')}")
+    today_foods = [
+        f"{meal_type_kr.get(meal.get('meal_type'), '')}:{item.get('name', '')}"
+        for meal in today_meals
+        for item in meal.get("meal_items", []) or []
+    ]
 
     # 2. Profile
-    profile_result = db.table("user_profiles").select(
-        "target_calories, current_weight_kg, goal_weight_kg"
-    ).eq("user_id", user_id).maybe_single().execute()
-
     profile = profile_result.data
     target_calories = profile.get("target_calories", 2000) if profile else 2000
     goal_weight = profile.get("goal_weight_kg") if profile else None
 
     # 3. Recent 7 days weight records
-    weight_logs_result = db.table("progress_logs").select(
-        "date, weight_kg"
-    ).eq("user_id", user_id).gte("date", week_ago_str).lte("date", today).order(
-        "date", desc=False
-    ).execute()
-
     weight_logs = weight_logs_result.data or []
     recent_weights = [
         WeightRecord(date=log["date"], weight=log["weight_kg"])
@@ -97,41 +121,31 @@ async def fetch_user_context(db: Client, user_id: str) -> UserContext:
             weight_trend = "stable"
 
     # 6. Weekly average calories + daily calories
-    weekly_meals_result = db.table("meals").select(
-        "date, total_calories"
-    ).eq("user_id", user_id).gte("date", week_ago_str).lte("date", today).execute()
-
-    weekly_meals = weekly_meals_result.data or []
+    recent_meals = weekly_meals_result.data or []
+    meal_dates = {meal.get("date") for meal in recent_meals}
+    weekly_meals = [meal for meal in recent_meals if meal.get("date") >= week_ago_str]
     weekly_avg_calories = 0
     recent_daily_calories: list[DailyCalorieRecord] = []
 
     if weekly_meals:
-        daily_calories: dict[str, int] = {}
-        for meal in weekly_meals:
-            meal_date = meal.get("date")
-            if meal_date not in daily_calories:
-                daily_calories[meal_date] = 0
-            daily_calories[meal_date] += meal.get("total_calories", 0) or 0
-
-        # Daily calorie records (sorted by date)
-        for d, cal in sorted(daily_calories.items()):
-            recent_daily_calories.append(DailyCalorieRecord(date=d, calories=cal))
-
-        days = len(daily_calories)
-        total_cal = sum(daily_calories.values())
-        weekly_avg_calories = round(total_cal / days) if days > 0 else 0
+        # Daily calorie records (rows come ordered by date, so group consecutive rows)
+        recent_daily_calories = [
+            DailyCalorieRecord(
+                date=d,
+                calories=sum(meal.get("total_calories", 0) or 0 for meal in day_meals),
+            )
+            for d, day_meals in groupby(weekly_meals, key=lambda meal: meal.get("date"))
+        ]
+
+        total_cal = sum(record.calories for record in recent_daily_calories)
+        weekly_avg_calories = round(total_cal / len(recent_daily_calories))
 
     # 7. Consecutive days (check last 7 days)
     consecutive_days = 0
     check_date = date.today() - timedelta(days=1)
 
     for _ in range(7):
-        date_str = format_date(check_date)
-        meals_check = db.table("meals").select("id").eq(
-            "user_id", user_id
-        ).eq("date", date_str).limit(1).execute()
-
-        if meals_check.data:
+        if format_date(check_date) in meal_dates:
             consecutive_days += 1
             check_date -= timedelta(days=1)
         else:
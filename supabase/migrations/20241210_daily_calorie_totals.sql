@@ -0,0 +1,26 @@
+-- Daily calorie totals RPC for the summary API (weekly/monthly reports)
+-- Groups meals by date in Postgres so only one row per day is returned
+
+CREATE OR REPLACE FUNCTION daily_calorie_totals(
+  p_user_id UUID,
+  p_start_date DATE,
+  p_end_date DATE
+)
+RETURNS TABLE (
+  meal_date DATE,
+  calories INT,
+  meals_count INT
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    m.date,
+    COALESCE(SUM(m.total_calories), 0)::INT,
+    COUNT(*)::INT
+  FROM public.meals m
+  WHERE m.user_id = p_user_id
+    AND m.date BETWEEN p_start_date AND p_end_date
+  GROUP BY m.date
+  ORDER BY m.date;
+END;
+$$ LANGUAGE plpgsql STABLE;
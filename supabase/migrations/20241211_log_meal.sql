@@ -0,0 +1,73 @@
+-- Meal logging RPC for the diet chatbot (log_meal tool)
+-- Finds or creates the meal, inserts new items and updates the total in one transaction
+
+CREATE OR REPLACE FUNCTION log_meal(
+  p_user_id UUID,
+  p_date DATE,
+  p_meal_type TEXT,
+  p_items JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_meal_id UUID;
+  v_created BOOLEAN := FALSE;
+  v_existing_names TEXT[] := '{}';
+  v_added_calories INT;
+BEGIN
+  -- Serialize logs of the same user/date/meal until commit: FOR UPDATE alone locks
+  -- nothing before the meal row exists, so two first logs would both insert one
+  PERFORM pg_advisory_xact_lock(
+    hashtext(p_user_id::text || '|' || p_date::text || '|' || p_meal_type)
+  );
+
+  -- Existing meal of the same date/type
+  SELECT m.id INTO v_meal_id
+  FROM public.meals m
+  WHERE m.user_id = p_user_id
+    AND m.date = p_date
+    AND m.meal_type = p_meal_type
+  ORDER BY m.created_at
+  LIMIT 1
+  FOR UPDATE;
+
+  IF v_meal_id IS NULL THEN
+    INSERT INTO public.meals (user_id, date, meal_type, total_calories)
+    VALUES (p_user_id, p_date, p_meal_type, 0)
+    RETURNING id INTO v_meal_id;
+    v_created := TRUE;
+  ELSE
+    SELECT COALESCE(array_agg(lower(mi.name)), '{}') INTO v_existing_names
+    FROM public.meal_items mi
+    WHERE mi.meal_id = v_meal_id;
+  END IF;
+
+  -- Insert items whose name isn't in the meal yet
+  WITH inserted AS (
+    INSERT INTO public.meal_items (meal_id, name, calories, protein_g, carbs_g, fat_g, quantity)
+    SELECT v_meal_id, i.name, i.calories, i.protein_g, i.carbs_g, i.fat_g, i.quantity
+    FROM jsonb_to_recordset(p_items) AS i(
+      name TEXT,
+      calories INT,
+      protein_g NUMERIC,
+      carbs_g NUMERIC,
+      fat_g NUMERIC,
+      quantity TEXT
+    )
+    WHERE NOT (lower(i.name) = ANY(v_existing_names))
+    RETURNING calories
+  )
+  SELECT SUM(calories) INTO v_added_calories FROM inserted;
+
+  IF v_added_calories IS NOT NULL THEN
+    UPDATE public.meals
+    SET total_calories = COALESCE(total_calories, 0) + v_added_calories
+    WHERE id = v_meal_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'meal_id', v_meal_id,
+    'created', v_created,
+    'existing_names', to_jsonb(v_existing_names)
+  );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,58 @@
+-- Meal item update RPC for the diet chatbot (update_meal tool)
+-- Finds the item, replaces it and adjusts the meal total in one transaction
+
+CREATE OR REPLACE FUNCTION update_meal_item(
+  p_user_id UUID,
+  p_date DATE,
+  p_meal_type TEXT,
+  p_old_name TEXT,
+  p_new_item JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_meal_id UUID;
+  v_item_id UUID;
+  v_old_name TEXT;
+  v_old_calories INT;
+  v_new_calories INT := COALESCE(ROUND((p_new_item->>'calories')::NUMERIC)::INT, 0);
+BEGIN
+  SELECT m.id INTO v_meal_id
+  FROM public.meals m
+  WHERE m.user_id = p_user_id
+    AND m.date = p_date
+    AND m.meal_type = p_meal_type
+  ORDER BY m.created_at
+  LIMIT 1
+  FOR UPDATE;
+
+  IF v_meal_id IS NULL THEN
+    RETURN jsonb_build_object('status', 'no_meal');
+  END IF;
+
+  -- First item whose name contains the old name (case-insensitive)
+  SELECT mi.id, mi.name, COALESCE(mi.calories, 0) INTO v_item_id, v_old_name, v_old_calories
+  FROM public.meal_items mi
+  WHERE mi.meal_id = v_meal_id
+    AND strpos(lower(mi.name), lower(p_old_name)) > 0
+  ORDER BY mi.created_at
+  LIMIT 1;
+
+  IF v_item_id IS NULL THEN
+    RETURN jsonb_build_object('status', 'no_item');
+  END IF;
+
+  UPDATE public.meal_items
+  SET name = p_new_item->>'name',
+      calories = v_new_calories,
+      protein_g = (p_new_item->>'protein_g')::NUMERIC,
+      carbs_g = (p_new_item->>'carbs_g')::NUMERIC,
+      fat_g = (p_new_item->>'fat_g')::NUMERIC
+  WHERE id = v_item_id;
+
+  UPDATE public.meals
+  SET total_calories = GREATEST(0, COALESCE(total_calories, 0) + v_new_calories - v_old_calories)
+  WHERE id = v_meal_id;
+
+  RETURN jsonb_build_object('status', 'updated', 'old_name', v_old_name);
+END;
+$$ LANGUAGE plpgsql;
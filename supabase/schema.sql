@@ -272,6 +272,160 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- 일별 칼로리 합계 함수 (요약 API 주간/월간 리포트, 날짜별 한 행만 반환)
+CREATE OR REPLACE FUNCTION daily_calorie_totals(
+  p_user_id UUID,
+  p_start_date DATE,
+  p_end_date DATE
+)
+RETURNS TABLE (
+  meal_date DATE,
+  calories INT,
+  meals_count INT
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    m.date,
+    COALESCE(SUM(m.total_calories), 0)::INT,
+    COUNT(*)::INT
+  FROM public.meals m
+  WHERE m.user_id = p_user_id
+    AND m.date BETWEEN p_start_date AND p_end_date
+  GROUP BY m.date
+  ORDER BY m.date;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- 식사 기록 함수 (식단 챗봇 log_meal, 식사 조회/생성 + 음식 추가 + 총 칼로리 갱신을 한 트랜잭션으로)
+CREATE OR REPLACE FUNCTION log_meal(
+  p_user_id UUID,
+  p_date DATE,
+  p_meal_type TEXT,
+  p_items JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_meal_id UUID;
+  v_created BOOLEAN := FALSE;
+  v_existing_names TEXT[] := '{}';
+  v_added_calories INT;
+BEGIN
+  -- Serialize logs of the same user/date/meal until commit: FOR UPDATE alone locks
+  -- nothing before the meal row exists, so two first logs would both insert one
+  PERFORM pg_advisory_xact_lock(
+    hashtext(p_user_id::text || '|' || p_date::text || '|' || p_meal_type)
+  );
+
+  -- Existing meal of the same date/type
+  SELECT m.id INTO v_meal_id
+  FROM public.meals m
+  WHERE m.user_id = p_user_id
+    AND m.date = p_date
+    AND m.meal_type = p_meal_type
+  ORDER BY m.created_at
+  LIMIT 1
+  FOR UPDATE;
+
+  IF v_meal_id IS NULL THEN
+    INSERT INTO public.meals (user_id, date, meal_type, total_calories)
+    VALUES (p_user_id, p_date, p_meal_type, 0)
+    RETURNING id INTO v_meal_id;
+    v_created := TRUE;
+  ELSE
+    SELECT COALESCE(array_agg(lower(mi.name)), '{}') INTO v_existing_names
+    FROM public.meal_items mi
+    WHERE mi.meal_id = v_meal_id;
+  END IF;
+
+  -- Insert items whose name isn't in the meal yet
+  WITH inserted AS (
+    INSERT INTO public.meal_items (meal_id, name, calories, protein_g, carbs_g, fat_g, quantity)
+    SELECT v_meal_id, i.name, i.calories, i.protein_g, i.carbs_g, i.fat_g, i.quantity
+    FROM jsonb_to_recordset(p_items) AS i(
+      name TEXT,
+      calories INT,
+      protein_g NUMERIC,
+      carbs_g NUMERIC,
+      fat_g NUMERIC,
+      quantity TEXT
+    )
+    WHERE NOT (lower(i.name) = ANY(v_existing_names))
+    RETURNING calories
+  )
+  SELECT SUM(calories) INTO v_added_calories FROM inserted;
+
+  IF v_added_calories IS NOT NULL THEN
+    UPDATE public.meals
+    SET total_calories = COALESCE(total_calories, 0) + v_added_calories
+    WHERE id = v_meal_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'meal_id', v_meal_id,
+    'created', v_created,
+    'existing_names', to_jsonb(v_existing_names)
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- 식사 음식 수정 함수 (식단 챗봇 update_meal, 음식 조회 + 수정 + 총 칼로리 조정을 한 트랜잭션으로)
+CREATE OR REPLACE FUNCTION update_meal_item(
+  p_user_id UUID,
+  p_date DATE,
+  p_meal_type TEXT,
+  p_old_name TEXT,
+  p_new_item JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_meal_id UUID;
+  v_item_id UUID;
+  v_old_name TEXT;
+  v_old_calories INT;
+  v_new_calories INT := COALESCE(ROUND((p_new_item->>'calories')::NUMERIC)::INT, 0);
+BEGIN
+  SELECT m.id INTO v_meal_id
+  FROM public.meals m
+  WHERE m.user_id = p_user_id
+    AND m.date = p_date
+    AND m.meal_type = p_meal_type
+  ORDER BY m.created_at
+  LIMIT 1
+  FOR UPDATE;
+
+  IF v_meal_id IS NULL THEN
+    RETURN jsonb_build_object('status', 'no_meal');
+  END IF;
+
+  -- First item whose name contains the old name (case-insensitive)
+  SELECT mi.id, mi.name, COALESCE(mi.calories, 0) INTO v_item_id, v_old_name, v_old_calories
+  FROM public.meal_items mi
+  WHERE mi.meal_id = v_meal_id
+    AND strpos(lower(mi.name), lower(p_old_name)) > 0
+  ORDER BY mi.created_at
+  LIMIT 1;
+
+  IF v_item_id IS NULL THEN
+    RETURN jsonb_build_object('status', 'no_item');
+  END IF;
+
+  UPDATE public.meal_items
+  SET name = p_new_item->>'name',
+      calories = v_new_calories,
+      protein_g = (p_new_item->>'protein_g')::NUMERIC,
+      carbs_g = (p_new_item->>'carbs_g')::NUMERIC,
+      fat_g = (p_new_item->>'fat_g')::NUMERIC
+  WHERE id = v_item_id;
+
+  UPDATE public.meals
+  SET total_calories = GREATEST(0, COALESCE(total_calories, 0) + v_new_calories - v_old_calories)
+  WHERE id = v_meal_id;
+
+  RETURN jsonb_build_object('status', 'updated', 'old_name', v_old_name);
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================================
 -- Development Helper: Create test user for development
 -- Run this ONLY in development environment